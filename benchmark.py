@@ -0,0 +1,260 @@
+"""
+无摄像头的流水线性能测试, 用回放源驱动 采集 -> 转换 -> 显示 流程
+
+python benchmark.py test_h264.mp4 --speed 0 --duration 10
+
+指定模型时改为测试识别引擎, 每个批大小输出一行吞吐量与延迟
+
+python benchmark.py test_h264.mp4 --model model.onnx --backend onnx --batch-sizes 1,8
+
+--mission时使用模拟控制器测试分拣节拍, 对比顺序与流水线模式
+
+python benchmark.py --mission --items 20 --recognize-time 0.8
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from capture import CaptureThread, FrameMailbox, FramePool, converted_shape, fit_size
+from fc_sim import SimulatedController
+from frame_source import ReplaySource
+from mission import SortCycle
+from motion import CarouselPlanner, Motion
+from recognition import RecognitionConfig, RecognitionEngine
+from stats import LatencyStats
+from voting import ResultVoter
+
+
+def run_pipeline(args) -> dict:
+    source = ReplaySource(args.path, speed=args.speed, loop=args.loop)
+    capture = CaptureThread(source=source)
+    pool = FramePool()
+    mailbox = FrameMailbox()
+    display_size = (args.display_width, args.display_height)
+    latencies = []
+    running = threading.Event()
+    running.set()
+    notify = threading.Event()
+
+    def convert():  # 对应MissionThread.show_image
+        seq = -1
+        while running.is_set():
+            if not capture.ring.wait(seq, timeout=0.1):
+                continue
+            size = fit_size(capture.ring.shape, display_size)
+            frame = pool.acquire(converted_shape(capture.ring.shape, None, size))
+            if frame is None:
+                seq = capture.ring.seq
+                continue
+            # 超时返回None, 回到循环开头检查running
+            ret = capture.next_after(seq, 0.1, out=frame.array, size=size)
+            if ret is None:
+                frame.release()
+                continue
+            frame.seq, frame.timestamp, frame.array = ret
+            seq = frame.seq
+            if mailbox.post(frame):
+                notify.set()
+
+    def display():  # 对应MainWindow.show_image, 用一次拷贝模拟贴图
+        held = None
+        while running.is_set():
+            if not notify.wait(0.1):
+                continue
+            notify.clear()
+            frame = mailbox.take()
+            if frame is None:
+                continue
+            frame.array.copy()
+            latencies.append(time.perf_counter() - frame.timestamp)
+            if held is not None:
+                held.release()
+            held = frame
+
+    threads = [
+        threading.Thread(target=convert, daemon=True),
+        threading.Thread(target=display, daemon=True),
+    ]
+    capture.start()
+    for thread in threads:
+        thread.start()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < args.duration and capture.is_alive():
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - t0
+    running.clear()
+    for thread in threads:
+        thread.join(1)
+        if thread.is_alive():
+            raise RuntimeError(f"{thread.name} did not stop")
+    capture.stop()
+
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "source": source.describe(),
+        "elapsed": round(elapsed, 3),
+        "captured": capture.frames_captured,
+        "displayed": mailbox.frames_taken,
+        "dropped": capture.frames_captured - mailbox.frames_taken,
+        "capture_fps": round(capture.frames_captured / elapsed, 2),
+        "display_fps": round(mailbox.frames_taken / elapsed, 2),
+        "latency_p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "latency_p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "pool_allocations": pool.allocations,
+    }
+
+
+def run_recognition(args, batch_size: int) -> dict:
+    source = ReplaySource(args.path, speed=args.speed, loop=args.loop)
+    capture = CaptureThread(source=source)
+    config = RecognitionConfig(
+        enabled=True,
+        backend=args.backend,
+        model=args.model,
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        max_batch=batch_size,
+        max_wait=args.max_wait,
+    )
+    # 不经过门限与投票, 每帧都推理
+    engine = RecognitionEngine(capture, config, voter=ResultVoter(enabled=False))
+    capture.start()
+    engine.start()
+    # 等待进程池启动和模型加载完成后再计时
+    print(f"batch size {batch_size}: loading model...", file=sys.stderr)
+    engine.ready.wait(60)
+    t0 = time.perf_counter()
+    while engine.batches == 0 and engine.errors == 0 and time.perf_counter() - t0 < 10:
+        time.sleep(0.05)
+    if engine.batches == 0:
+        engine.stop()
+        capture.stop()
+        if engine.last_error is not None:
+            raise RuntimeError(f"recognition failed: {engine.last_error!r}")
+        raise RuntimeError(
+            f"no batch inferred within 10s ({capture.frames_captured} frames captured)"
+        )
+    window = 100000
+    engine.inference_stats = LatencyStats("inference", window)
+    engine.latency_stats = LatencyStats("end_to_end", window)
+    images, batches = engine.images, engine.batches
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < args.duration and capture.is_alive():
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - t0
+    images, batches = engine.images - images, engine.batches - batches
+    engine.stop()
+    capture.stop()
+
+    latency = engine.latency_stats
+    return {
+        "batch_size": batch_size,
+        "elapsed": round(elapsed, 3),
+        "images": images,
+        "mean_batch": round(images / batches, 2) if batches else 0.0,
+        "images_per_sec": round(images / elapsed, 2),
+        "inference_p95_ms": round(engine.inference_stats.percentile(95), 2),
+        "latency_p50_ms": round(latency.percentile(50), 2),
+        "latency_p95_ms": round(latency.percentile(95), 2),
+        "errors": engine.errors,
+    }
+
+
+class _Item:
+    name = "sim"
+
+
+def run_mission(args, pipelined: bool) -> dict:
+    """
+    与MissionThread相同的转动/投放指令, 识别用固定耗时模拟: 开始成像后recognize_time提交结果
+    """
+    api = SimulatedController(
+        rotation_speed=args.rotation_speed,
+        latency=args.latency,
+        fault_rate=args.fault_rate,
+        fault_mode="stall",
+        time_scale=args.time_scale,
+        seed=0,
+    )
+    motion = Motion(api, CarouselPlanner(speed=args.rotation_speed))
+    state = {"sight": 1, "down": 0}
+
+    def recognize():
+        delay = args.recognize_time / args.time_scale
+        timer = threading.Timer(delay, sorter.put, (_Item,))
+        timer.daemon = True
+        timer.start()
+
+    def rotate():
+        state["sight"] = (state["sight"] + 1) % 6
+        return motion.rotate(
+            {api.STEP1: state["sight"], api.STEP2: state["sight"] - state["down"]}
+        )
+
+    def release():
+        state["down"] += 1
+        slots = {api.STEP2: state["sight"] - state["down"]}
+        return motion.rotate(slots, coalesce=False)
+
+    sorter = SortCycle(rotate, release, recognize, pipelined, stats_window=args.items)
+    t0 = time.perf_counter()
+    sorter.run(args.items)
+    elapsed = (time.perf_counter() - t0) * args.time_scale
+    motion.shutdown()
+    result = sorter.snapshot()
+    # 模拟时钟下的节拍
+    result["items_per_min"] = round(args.items / elapsed * 60, 2)
+    for key in ("cycle_p50_s", "recognize_s", "rotate_s", "release_s"):
+        result[key] = round(result[key] * args.time_scale, 3)
+    result["elapsed_s"] = round(elapsed, 3)
+    result["commands"] = api.commands
+    result["faults"] = api.faults
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rubbish pipeline benchmark")
+    parser.add_argument(
+        "path", nargs="?", help="video file, image file or image directory"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=0, help="replay speed, 1=native, 0=max"
+    )
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--no-loop", dest="loop", action="store_false")
+    parser.add_argument("--display-width", type=int, default=640)
+    parser.add_argument("--display-height", type=int, default=480)
+    parser.add_argument("--model", help="benchmark recognition with this model")
+    parser.add_argument("--backend", default="opencv", choices=["opencv", "onnx"])
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16")
+    parser.add_argument("--max-wait", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--mission", action="store_true", help="sort cycle benchmark")
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--recognize-time", type=float, default=0.8)
+    parser.add_argument("--rotation-speed", type=float, default=45)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--time-scale", type=float, default=10, help="sim speedup")
+    args = parser.parse_args()
+    if args.mission:
+        for pipelined in (False, True):
+            print(json.dumps(run_mission(args, pipelined), ensure_ascii=False))
+        return
+    if args.path is None:
+        parser.error("path is required")
+    if not args.model:
+        print(json.dumps(run_pipeline(args), ensure_ascii=False))
+        return
+    for batch_size in map(int, args.batch_sizes.split(",")):
+        print(json.dumps(run_recognition(args, batch_size), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def dhash(gray: np.ndarray) -> int:
+    """
+    差值哈希, 输入为9x8灰度图, 比较相邻像素得到64位
+    """
+    bits = gray[:, 1:] > gray[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash(gray: np.ndarray) -> int:
+    """
+    感知哈希, 输入为32x32灰度图, 取DCT低频8x8与中值比较得到64位
+    """
+    low = cv2.dct(gray.astype(np.float32))[:8, :8]
+    bits = low > np.median(low)
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+HASHES = {
+    "dhash": (dhash, (9, 8)),
+    "phash": (phash, (32, 32)),
+}
+
+
+class RecognitionCache:
+    """
+    以(视角位置, 前景物品的感知哈希)为键缓存识别结果(各类别概率)
+    同一位置汉明距离不超过max_distance即命中, 超过max_entries按LRU淘汰, 超过ttl(s)过期
+    只对前景裁剪计算哈希, 整个识别区域的哈希几乎不受小物品影响
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        hash="dhash",
+        max_distance=3,
+        max_entries=256,
+        ttl=600.0,
+    ) -> None:
+        self.enabled = enabled
+        self.hash_func, self.size = HASHES[hash]  # size为计算哈希的灰度图尺寸(w, h)
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # 键 -> (概率, 写入时间)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "RecognitionCache":
+        return cls(**items)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, gray: np.ndarray, position=None) -> tuple:
+        return position, self.hash_func(gray)
+
+    def get(self, key: tuple) -> Optional[np.ndarray]:
+        """
+        查找汉明距离最近且在容差内的缓存结果, 未命中返回None
+        """
+        now = time.monotonic()
+        position, value = key
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            for k, (scores, t) in list(self._entries.items()):
+                if now - t > self.ttl:
+                    del self._entries[k]
+                    self.expired += 1
+                    continue
+                if k[0] != position:
+                    continue
+                distance = bin(k[1] ^ value).count("1")
+                if distance < best_distance:
+                    best, best_distance = k, distance
+                    if distance == 0:
+                        break
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            return self._entries[best][0]
+
+    def put(self, key: tuple, scores: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = (scores, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,129 @@
+import glob
+import json
+import sys
+
+import cv2
+
+BACKENDS = {
+    "ANY": cv2.CAP_ANY,
+    "V4L2": cv2.CAP_V4L2,
+    "FFMPEG": cv2.CAP_FFMPEG,
+    "DSHOW": cv2.CAP_DSHOW,
+    "MSMF": cv2.CAP_MSMF,
+}
+
+
+def decode_fourcc(value) -> str:
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+class CameraConfig:
+    """
+    摄像头模式配置, 对应settings.json中的"camera"项, 为0或空的项保持驱动默认值
+    """
+
+    def __init__(
+        self,
+        backend="ANY",
+        width=0,
+        height=0,
+        fps=0,
+        fourcc="",
+        buffer_size=0,
+    ) -> None:
+        self.backend = backend.upper()
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc.upper()
+        self.buffer_size = buffer_size
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "CameraConfig":
+        return cls(**items)
+
+    @property
+    def api_preference(self) -> int:
+        return BACKENDS.get(self.backend, cv2.CAP_ANY)
+
+
+def list_devices(max_index: int = 10) -> list:
+    """
+    枚举可用的摄像头序号, Linux下直接读取/dev/video*, 其他系统只能逐个尝试
+    """
+    if not sys.platform.startswith("linux"):
+        return list(range(max_index))
+    indices = []
+    for path in glob.glob("/dev/video*"):
+        suffix = path[len("/dev/video") :]
+        if suffix.isdigit():
+            indices.append(int(suffix))
+    return sorted(indices)
+
+
+def load_last_device(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as reader:
+            return json.load(reader).get("last_device")
+    except (OSError, ValueError):
+        return None
+
+
+def save_last_device(path: str, index) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as writer:
+            json.dump({"last_device": index}, writer)
+    except OSError:
+        pass
+
+
+def candidate_devices(last_device=None) -> list:
+    """
+    上次成功的设备优先, 其余按序号排列
+    """
+    devices = list_devices()
+    if last_device in devices:
+        devices.remove(last_device)
+        devices.insert(0, last_device)
+    return devices
+
+
+def open_camera(cam: cv2.VideoCapture, index, config: CameraConfig) -> bool:
+    """
+    按配置打开摄像头并协商模式, FOURCC需在分辨率之前设置, 否则部分驱动会忽略
+    """
+    cam.open(index, config.api_preference)
+    if not cam.isOpened():
+        return False
+    if config.fourcc:
+        cam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.fourcc[:4]))
+    if config.width and config.height:
+        cam.set(cv2.CAP_PROP_FRAME_WIDTH, config.width)
+        cam.set(cv2.CAP_PROP_FRAME_HEIGHT, config.height)
+    if config.fps:
+        cam.set(cv2.CAP_PROP_FPS, config.fps)
+    if config.buffer_size:
+        cam.set(cv2.CAP_PROP_BUFFERSIZE, config.buffer_size)
+    return True
+
+
+def negotiated_mode(cam: cv2.VideoCapture) -> dict:
+    """
+    读取驱动实际接受的模式
+    """
+    return {
+        "backend": cam.getBackendName() if cam.isOpened() else "",
+        "width": int(cam.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cam.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cam.get(cv2.CAP_PROP_FPS),
+        "fourcc": decode_fourcc(cam.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cam.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def format_mode(mode: dict) -> str:
+    return (
+        f"{mode['backend']} {mode['fourcc']} {mode['width']}x{mode['height']}"
+        f"@{mode['fps']:.1f} buffers={mode['buffer_size']}"
+    )
@@ -0,0 +1,459 @@
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from frame_source import CameraSource, FrameSource
+from stats import PipelineStats
+
+CHANNEL_CODES = {
+    ("BGR", "RGB"): cv2.COLOR_BGR2RGB,
+    ("BGR", "GRAY"): cv2.COLOR_BGR2GRAY,
+    ("RGB", "BGR"): cv2.COLOR_RGB2BGR,
+    ("RGB", "GRAY"): cv2.COLOR_RGB2GRAY,
+}
+
+
+def conversion_code(src: str, dst: Optional[str]) -> Optional[int]:
+    """
+    通道顺序转换代码, 顺序相同时返回None(只拷贝不转换)
+    """
+    if dst is None or dst == src:
+        return None
+    return CHANNEL_CODES[(src, dst)]
+
+
+def converted_shape(shape, dst: Optional[str], size=None):
+    if size is not None:
+        shape = (size[1], size[0]) + tuple(shape[2:])
+    return shape[:2] if dst == "GRAY" else shape
+
+
+def fit_size(shape, target) -> Tuple[int, int]:
+    """
+    保持宽高比缩放到target(w, h)内的尺寸
+    """
+    h, w = shape[:2]
+    scale = min(target[0] / w, target[1] / h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+class FrameRing:
+    """
+    固定大小的帧环形缓冲区, 单写多读
+    写入方直接读帧到预分配的槽位中, 读取方拷贝后校验序号, 不会阻塞写入方
+    读取方拷贝期间写入方跳过该槽位(帧序号随之跳过), 保证读取方总能完成拷贝
+    帧序号与槽位对齐(槽位号 = seq % size), 不连续, 统计帧数使用frames_published
+    """
+
+    def __init__(self, size: int = 4, order: str = "BGR") -> None:
+        assert size >= 3, "ring size must be >= 3"
+        self.size = size
+        self.order = order  # 槽位中帧的通道顺序, cv2默认为BGR
+        self.slots: list = [None] * size
+        self.slot_seq = np.full(size, -1, dtype=np.int64)
+        self.slot_ts = np.zeros(size, dtype=np.float64)
+        self.seq = -1  # 最新已发布的帧序号, 跳过槽位时不连续
+        self.frames_published = 0  # 已发布的帧数
+        self._pins = [0] * size  # 各槽位正在拷贝的读取方数量
+        self._pin_lock = threading.Lock()
+        self._scratch = threading.local()  # 各读取线程的缩放中间缓冲
+        self._cond = threading.Condition()
+
+    def _slot_buffer(self, index: int, shape, dtype) -> np.ndarray:
+        buf = self.slots[index]
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self.slots[index] = buf
+        return buf
+
+    def begin_write(self) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        取得下一个写入槽位, 返回(槽位号, 缓冲区), 缓冲区在首帧前为None
+        """
+        with self._pin_lock:
+            for offset in range(1, self.size):
+                index = (self.seq + offset) % self.size
+                if not self._pins[index]:
+                    break
+            else:  # 全部被读取方占用, 覆盖下一个槽位, 读取方校验序号后丢弃
+                index = (self.seq + 1) % self.size
+            self.slot_seq[index] = -1  # 标记为写入中
+        return index, self.slots[index]
+
+    def commit(self, index: int, frame: np.ndarray, timestamp: float) -> int:
+        """
+        发布槽位中的帧, frame不是该槽位的缓冲区时会拷贝进去
+        """
+        buf = self.slots[index]
+        if frame is not buf:
+            buf = self._slot_buffer(index, frame.shape, frame.dtype)
+            np.copyto(buf, frame)
+        seq = self.seq + 1 + (index - self.seq - 1) % self.size
+        self.slot_ts[index] = timestamp
+        self.slot_seq[index] = seq
+        with self._cond:
+            self.seq = seq
+            self.frames_published += 1
+            self._cond.notify_all()
+        return seq
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        index, _ = self.begin_write()
+        return self.commit(
+            index, frame, time.perf_counter() if timestamp is None else timestamp
+        )
+
+    def _read(
+        self,
+        seq: int,
+        out: Optional[np.ndarray],
+        order: Optional[str],
+        size=None,
+        roi=None,
+    ):
+        index = seq % self.size
+        with self._pin_lock:
+            buf = self.slots[index]
+            if buf is None or self.slot_seq[index] != seq:
+                return None
+            self._pins[index] += 1
+        try:
+            return self._copy(seq, index, buf, out, order, size, roi)
+        finally:
+            with self._pin_lock:
+                self._pins[index] -= 1
+
+    def _scratch_buffer(self, shape, dtype) -> np.ndarray:
+        buf = getattr(self._scratch, "buf", None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._scratch.buf = np.empty(shape, dtype=dtype)
+        return buf
+
+    def _copy(self, seq: int, index: int, buf, out, order, size, roi):
+        if roi is not None:  # 裁剪为视图, 不拷贝
+            x, y, w, h = roi
+            buf = buf[y : y + h, x : x + w]
+        if size is not None and tuple(size) == (buf.shape[1], buf.shape[0]):
+            size = None
+        code = conversion_code(self.order, order)
+        shape = converted_shape(buf.shape, order, size)
+        if out is None or out.shape != shape or out.dtype != buf.dtype:
+            out = np.empty(shape, dtype=buf.dtype)
+        if size is not None:  # 先缩小再转换, 转换只处理缩小后的像素
+            if code is None:
+                cv2.resize(buf, size, dst=out, interpolation=cv2.INTER_AREA)
+            elif out.ndim == buf.ndim:  # BGR/RGB互换通道数不变, 缩小到out后原地转换
+                cv2.resize(buf, size, dst=out, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(out, code, dst=out)
+            else:  # 灰度需要中间缓冲, 每个读取线程复用一份
+                shape = (size[1], size[0]) + buf.shape[2:]
+                src = self._scratch_buffer(shape, buf.dtype)
+                cv2.resize(buf, size, dst=src, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(src, code, dst=out)
+        elif code is None:
+            np.copyto(out, buf)
+        else:  # 颜色转换与拷贝合并为一次写入
+            cv2.cvtColor(buf, code, dst=out)
+        ts = self.slot_ts[index]
+        if self.slot_seq[index] != seq:  # 拷贝期间被覆盖
+            return None
+        return seq, ts, out
+
+    def read(
+        self,
+        seq: int,
+        out: Optional[np.ndarray] = None,
+        order: Optional[str] = None,
+        size=None,
+        roi=None,
+    ):
+        """
+        读取指定序号的帧, 已被覆盖时返回None
+        roi: 裁剪区域(x, y, w, h), 先裁剪再缩放/转换
+        """
+        return self._read(seq, out, order, size, roi)
+
+    def latest(
+        self, out: Optional[np.ndarray] = None, order: Optional[str] = None, size=None
+    ):
+        """
+        读取最新帧, 返回(seq, timestamp, frame), 无帧时返回None
+        out: 目标缓冲区, order: 使用方需要的通道顺序(BGR/RGB/GRAY), 默认不转换
+        size: 目标尺寸(w, h), 使用INTER_AREA缩放, 默认原尺寸
+        """
+        while True:
+            seq = self.seq
+            if seq < 0:
+                return None
+            ret = self._read(seq, out, order, size)
+            if ret is not None:
+                return ret
+
+    @property
+    def shape(self):
+        """
+        最新帧的形状, 无帧时为None
+        """
+        seq = self.seq
+        if seq < 0:
+            return None
+        buf = self.slots[seq % self.size]
+        return None if buf is None else buf.shape
+
+    def wait(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """
+        等待序号大于seq的帧发布, 超时返回False
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while self.seq <= seq:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def next_after(
+        self,
+        seq: int,
+        timeout: Optional[float] = None,
+        out: Optional[np.ndarray] = None,
+        order: Optional[str] = None,
+        size=None,
+        roi=None,
+    ):
+        """
+        读取序号大于seq的帧, 若已落后超过一圈则直接返回最新帧, 超时返回None
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        if not self.wait(seq, timeout):
+            return None
+        while True:
+            newest = self.seq
+            want = max(seq + 1, newest - self.size + 2)
+            ret = self._read(want, out, order, size, roi)
+            if ret is not None:
+                return ret
+            ret = self._read(self.seq, out, order, size, roi)
+            if ret is not None:
+                return ret
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+
+
+class PooledFrame:
+    """
+    从FramePool借出的帧缓冲, 所有权随信号传递, 使用方处理完后调用release归还
+    """
+
+    def __init__(
+        self, array: np.ndarray, pool: Optional["FramePool"] = None, order: str = "BGR"
+    ) -> None:
+        self.array = array
+        self.pool = pool
+        self.order = order
+        self.seq = -1
+        self.timestamp = 0.0
+        self.bytes_copied = 0  # 该帧从采集到显示累计拷贝的字节数
+
+    def release(self) -> None:
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            pool.release(self)
+
+
+class FramePool:
+    """
+    预分配帧缓冲池, 池空时acquire返回None由调用方丢帧, 避免每帧分配内存
+    """
+
+    def __init__(self, max_buffers: int = 4) -> None:
+        self.max_buffers = max_buffers
+        self.allocations = 0
+        self._free = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8) -> Optional[PooledFrame]:
+        with self._lock:
+            while self._free:
+                array = self._free.pop()
+                if array.shape == shape and array.dtype == dtype:
+                    break
+                self._count -= 1  # 分辨率变化, 丢弃旧缓冲
+            else:
+                if self._count >= self.max_buffers:
+                    return None
+                array = np.empty(shape, dtype=dtype)
+                self._count += 1
+                self.allocations += 1
+        return PooledFrame(array, self)
+
+    def release(self, frame: PooledFrame) -> None:
+        with self._lock:
+            self._free.append(frame.array)
+
+
+class FrameMailbox:
+    """
+    只保存一帧的信箱, 新帧覆盖未取走的旧帧(旧帧归还缓冲池并计为丢弃)
+    """
+
+    def __init__(self) -> None:
+        self.frames_posted = 0
+        self.frames_taken = 0
+        self.frames_dropped = 0
+        self._frame: Optional[PooledFrame] = None
+        self._lock = threading.Lock()
+
+    def post(self, frame: PooledFrame) -> bool:
+        """
+        投递新帧, 信箱原本为空时返回True, 调用方据此决定是否通知界面
+        """
+        with self._lock:
+            old, self._frame = self._frame, frame
+            self.frames_posted += 1
+            if old is not None:
+                self.frames_dropped += 1
+        if old is not None:
+            old.release()
+        return old is None
+
+    def take(self) -> Optional[PooledFrame]:
+        with self._lock:
+            frame, self._frame = self._frame, None
+        if frame is not None:
+            self.frames_taken += 1
+        return frame
+
+
+class CaptureThread(threading.Thread):
+    """
+    独占帧来源(摄像头/回放)的采集线程, 帧写入FrameRing
+    """
+
+    def __init__(
+        self,
+        ring_size: int = 4,
+        source: Optional[FrameSource] = None,
+        stats_window: int = 120,
+    ) -> None:
+        super().__init__(name="CaptureThread", daemon=True)
+        self.source = CameraSource() if source is None else source
+        self.ring = FrameRing(ring_size)
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        self.stats = PipelineStats("capture", stats_window)
+        self.time_to_first_frame = 0.0  # 最近一次(重)连接到出帧的耗时
+        self.on_state: Optional[Callable[[str], None]] = None
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+
+    ### 重连参数
+    backoff_min = 0.5
+    backoff_max = 5.0
+    max_read_failures = 50  # 连续读帧失败次数, 超过则认为摄像头已断开
+
+    def _notify(self, state: str) -> None:
+        if self.on_state is not None:
+            self.on_state(state)
+
+    @property
+    def capture_fps(self) -> float:
+        return self.stats.fps
+
+    def isOpened(self) -> bool:
+        return self.source.isOpened()
+
+    def _connect(self) -> bool:
+        """
+        阻塞直到打开帧来源或线程被停止, 失败时指数退避
+        """
+        backoff = self.backoff_min
+        while self._running.is_set():
+            with self._lock:
+                ret = self.source.open()
+            if ret:
+                self._notify("connected")
+                return True
+            self._notify("not_found")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+        return False
+
+    def _disconnect(self) -> None:
+        with self._lock:
+            self.source.release()
+        if self.source.finished:
+            self._running.clear()
+            self._notify("finished")
+            return
+        self.reconnects += 1
+        self._notify("lost")
+
+    def run(self) -> None:
+        self._running.set()
+        while self._running.is_set():
+            t0 = time.perf_counter()
+            if not self._connect():
+                break
+            if self._capture(t0):
+                self._disconnect()
+
+    def _capture(self, t0: float) -> bool:
+        """
+        采集循环, 摄像头断开时返回True
+        """
+        first_frame = True
+        failures = 0
+        while self._running.is_set():
+            with self._lock:
+                index, buf = self.ring.begin_write()
+                ret, frame = self.source.read(buf)
+            if not ret:
+                self.read_failures += 1
+                failures += 1
+                if failures >= self.max_read_failures or not self.isOpened():
+                    return True
+                time.sleep(0.01)
+                continue
+            failures = 0
+            if frame is not buf:  # 首帧或分辨率变化, 直接接管cv2分配的数组
+                self.ring.slots[index] = frame
+            now = time.perf_counter()
+            self.ring.commit(index, frame, now)
+            self.frames_captured += 1
+            if first_frame:
+                first_frame = False
+                self.stats.reset()
+                self.time_to_first_frame = now - t0
+                self._notify("first_frame")
+            self.stats.tick(now)
+        return False
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self.is_alive():
+            self.join(1)
+        with self._lock:
+            self.source.release()
+
+    def latest(
+        self, out: Optional[np.ndarray] = None, order: Optional[str] = None, size=None
+    ):
+        return self.ring.latest(out, order, size)
+
+    def next_after(
+        self,
+        seq: int,
+        timeout: Optional[float] = None,
+        out: Optional[np.ndarray] = None,
+        order: Optional[str] = None,
+        size=None,
+        roi=None,
+    ):
+        return self.ring.next_after(seq, timeout, out, order, size, roi)
@@ -0,0 +1,261 @@
+"""
+无界面批量识别, 对图片目录与视频文件使用与rubbish.py相同的 回放 -> 裁剪缩放 -> 推理 流程
+视频每个文件一个任务, 图片每max_batch张一个任务, 分发到进程池
+每批推理结果经队列立即送回, 逐行输出JSONL
+结束时在stderr输出吞吐量汇总
+图片的上级目录名为物品名称时记为标注, 汇总中给出准确率
+
+python classify.py samples videos/test_h264.mp4 --model model.onnx --backend onnx > out.jsonl
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import recognition
+from capture import FrameRing
+from frame_source import IMAGE_EXTS, ReplaySource
+from labels import category
+from recognition import RecognitionConfig
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+_results = None  # 子进程中送回结果的队列, 每个任务结束时送回None
+
+
+def collect_files(paths):
+    """
+    展开目录, 返回所有图片与视频文件
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, _, names in os.walk(path):
+            for name in sorted(names):
+                if name.lower().endswith(IMAGE_EXTS + VIDEO_EXTS):
+                    files.append(os.path.join(root, name))
+    return files
+
+
+def _init(config: RecognitionConfig, results) -> None:
+    global _results
+    _results = results
+    recognition._init_worker(config)
+
+
+def make_tasks(files, batch_size: int):
+    """
+    视频每个文件一个任务, 图片每batch_size张一个任务, 一次推理
+    """
+    tasks, images = [], []
+    for path in files:
+        if path.lower().endswith(VIDEO_EXTS):
+            tasks.append([path])
+            continue
+        images.append(path)
+        if len(images) == batch_size:
+            tasks.append(images)
+            images = []
+    if images:
+        tasks.append(images)
+    return tasks
+
+
+def _classify_task(paths, stride: int = 1, position=None) -> None:
+    """
+    子进程中识别一个任务: 一个视频文件的所有帧(每stride帧取一帧)或一组图片, 按max_batch凑批推理
+    """
+    try:
+        recognition._warmup()  # 模型加载失败时抛出
+        if paths[0].lower().endswith(VIDEO_EXTS):
+            _classify_video(paths[0], stride, position)
+        else:
+            _classify_images(paths, position)
+    finally:
+        _results.put(None)
+
+
+class _Batch:
+    """
+    子进程中的批缓冲, 帧经FrameRing裁剪缩放后写入, 凑满max_batch推理并送回结果
+    """
+
+    def __init__(self, position) -> None:
+        self.config = recognition._classifier.config
+        self.position = position
+        self.ring = FrameRing(3)
+        w, h = self.config.input_size
+        self.images = np.empty((self.config.max_batch, h, w, 3), dtype=np.uint8)
+        self.frames = []  # [(文件, 帧号)]
+
+    def add(self, path: str, frame: int, seq: int) -> None:
+        ring, config = self.ring, self.config
+        roi = config.roi_for(self.position, ring.shape)
+        out = self.images[len(self.frames)]
+        ring.read(seq, out, config.order, config.input_size, roi)
+        self.frames.append((path, frame))
+        if len(self.frames) == config.max_batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.frames:
+            return
+        config = self.config
+        records = []
+        scores, latency = recognition._classify(self.images[: len(self.frames)])
+        for (path, frame), s in zip(self.frames, scores):
+            index = int(np.argmax(s))
+            name = config.labels[index]
+            record = {
+                "file": path,
+                "frame": frame,
+                "category": category.get(name, "其他垃圾"),
+                "name": name,
+                "confidence": round(float(s[index]), 4),
+                "latency": round(latency / len(self.frames) * 1000, 3),
+            }
+            label = os.path.basename(os.path.dirname(path))
+            if label in config.labels:  # 上级目录名为物品名称
+                record["label"] = label
+            records.append(record)
+        self.frames.clear()
+        _results.put(records)
+
+
+def _classify_video(path: str, stride: int, position) -> None:
+    source = ReplaySource(path, speed=0, loop=False)
+    if not source.open():
+        _results.put([{"file": path, "error": "cannot open"}])
+        return
+    batch = _Batch(position)
+    ring = batch.ring
+    frame = 0
+    while True:
+        index, buf = ring.begin_write()
+        ret, image = source.read(buf)
+        if not ret:
+            break
+        seq = ring.commit(index, image, time.perf_counter())
+        if frame % stride == 0:
+            batch.add(path, frame, seq)
+        frame += 1
+    source.release()
+    batch.flush()
+
+
+def _classify_images(paths, position) -> None:
+    batch = _Batch(position)
+    errors = []
+    for path in paths:
+        # 路径含中文时cv2.imread在Windows上无法读取
+        image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            errors.append({"file": path, "error": "cannot open"})
+            continue
+        batch.add(path, 0, batch.ring.write(image))
+    batch.flush()
+    if errors:
+        _results.put(errors)
+
+
+def load_config(args) -> RecognitionConfig:
+    items = {}
+    if os.path.isfile(args.settings):
+        with open(args.settings, "r", encoding="utf-8") as reader:
+            items = json.load(reader).get("recognition", {})
+    items["enabled"] = True
+    items["mode"] = "classify"
+    for key in ("model", "backend", "workers", "max_batch"):
+        value = getattr(args, key)
+        if value is not None:
+            items[key] = value
+    return RecognitionConfig.from_dict(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offline batch classification")
+    parser.add_argument("paths", nargs="+", help="image/video files or directories")
+    parser.add_argument("--settings", default="settings.json")
+    parser.add_argument("--model")
+    parser.add_argument("--backend", choices=["opencv", "onnx"])
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--max-batch", dest="max_batch", type=int)
+    parser.add_argument("--stride", type=int, default=1, help="video frame stride")
+    parser.add_argument("--position", help="sight position whose roi is used")
+    parser.add_argument("--output", help="JSONL output file, default stdout")
+    args = parser.parse_args()
+
+    config = load_config(args)
+    files = collect_files(args.paths)
+    tasks = make_tasks(files, config.max_batch)
+    output = sys.stdout
+    if args.output is not None:
+        output = open(args.output, "w", encoding="utf-8")
+    latencies = []
+    correct = labeled = errors = 0
+    ctx = multiprocessing.get_context(config.start_method)
+    results = ctx.Queue()
+    finished = 0
+    t0 = time.perf_counter()
+    with ctx.Pool(
+        config.workers,
+        initializer=_init,
+        initargs=(config, results),
+    ) as pool:
+        task = functools.partial(
+            _classify_task, stride=args.stride, position=args.position
+        )
+        pending = pool.map_async(task, tasks)
+        while finished < len(tasks):
+            try:
+                records = results.get(timeout=1)
+            except queue.Empty:
+                if pending.ready():
+                    pending.get()  # 子进程异常时抛出
+                continue
+            if records is None:
+                finished += 1
+                continue
+            for record in records:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if "error" in record:
+                    errors += 1
+                    continue
+                latencies.append(record["latency"])
+                if "label" in record:
+                    labeled += 1
+                    correct += record["label"] == record["name"]
+            output.flush()
+        pending.get()
+    elapsed = time.perf_counter() - t0
+    if output is not sys.stdout:
+        output.close()
+
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    summary = {
+        "files": len(files),
+        "images": len(latencies),
+        "errors": errors,
+        "elapsed": round(elapsed, 3),
+        "images_per_sec": round(len(latencies) / elapsed, 2),
+        "latency_mean_ms": round(float(lat.mean()), 3),
+        "latency_p95_ms": round(float(np.percentile(lat, 95)), 3),
+        "accuracy": round(correct / labeled, 4) if labeled else None,
+        "workers": config.workers,
+        "max_batch": config.max_batch,
+    }
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
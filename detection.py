@@ -0,0 +1,170 @@
+import itertools
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from voting import ResultVoter
+
+
+class BlobDetector:
+    """
+    前景块检测, 与缓慢更新的空托盘背景比较, 每个连通域为一个物品框
+    输入为识别区域缩小后的灰度图, 输出归一化的(x, y, w, h)
+    各视角位置的背景分别保存, 首次看到某位置时假定托盘为空
+    """
+
+    def __init__(
+        self,
+        size=(160, 120),
+        threshold=25,
+        min_area=0.01,
+        learning_rate=0.02,
+        blur=True,
+    ) -> None:
+        self.size = tuple(size)  # (w, h)
+        self.threshold = threshold  # 前景像素的最小灰度差
+        self.min_area = min_area  # 物品框最小面积, 占识别区域的比例
+        self.learning_rate = learning_rate
+        self.blur = blur
+        self._backgrounds = {}
+        self._frame = np.empty((self.size[1], self.size[0]), dtype=np.float32)
+        self._diff = np.empty_like(self._frame)
+        self._mask = np.empty(self._frame.shape, dtype=np.uint8)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "BlobDetector":
+        return cls(**items)
+
+    def reset(self) -> None:
+        self._backgrounds.clear()
+
+    def detect(self, gray: np.ndarray, position=None) -> List[tuple]:
+        if self.blur:
+            cv2.GaussianBlur(gray, (5, 5), 0, dst=gray)
+        frame = self._frame
+        np.copyto(frame, gray, casting="unsafe")
+        background = self._backgrounds.get(position)
+        if background is None:
+            self._backgrounds[position] = frame.copy()
+            return []
+        cv2.absdiff(frame, background, dst=self._diff)
+        cv2.threshold(
+            self._diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self._diff
+        )
+        np.copyto(self._mask, self._diff, casting="unsafe")
+        cv2.morphologyEx(self._mask, cv2.MORPH_CLOSE, self._kernel, dst=self._mask)
+        n, _, blobs, _ = cv2.connectedComponentsWithStats(self._mask)
+        w, h = self.size
+        min_pixels = self.min_area * w * h
+        boxes = [
+            (float(x / w), float(y / h), float(bw / w), float(bh / h))
+            for x, y, bw, bh, area in blobs[1:n]
+            if area >= min_pixels
+        ]
+        if not boxes:  # 托盘为空时才更新背景
+            cv2.accumulateWeighted(frame, background, self.learning_rate)
+        return boxes
+
+
+def iou(a, b) -> float:
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1 = min(a[0] + a[2], b[0] + b[2])
+    y1 = min(a[1] + a[3], b[1] + b[3])
+    inter = max(x1 - x0, 0) * max(y1 - y0, 0)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def centroid_distance(a, b) -> float:
+    dx = (a[0] + a[2] / 2) - (b[0] + b[2] / 2)
+    dy = (a[1] + a[3] / 2) - (b[1] + b[3] / 2)
+    return (dx * dx + dy * dy) ** 0.5
+
+
+class Track:
+    def __init__(self, track_id: int, box, voter: ResultVoter) -> None:
+        self.id = track_id
+        self.box = box
+        self.voter = voter  # 每个物品单独投票
+        self.misses = 0  # 连续未匹配的帧数
+        self.pending = False  # 已有裁剪图在推理中
+        self.label: Optional[int] = None  # 投票提交后的类别, 之后不再推理
+
+    @property
+    def classified(self) -> bool:
+        return self.label is not None
+
+
+class IoUTracker:
+    """
+    按IoU贪心匹配相邻帧的物品框, IoU不足时按中心点距离匹配, 未匹配的框新建轨迹
+    轨迹连续max_misses帧未匹配后删除
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.15, max_misses=15) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance  # 归一化坐标下的中心点距离
+        self.max_misses = max_misses
+        self.tracks: List[Track] = []
+        self.tracks_created = 0
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "IoUTracker":
+        return cls(**items)
+
+    def reset(self) -> None:
+        self.tracks = []
+
+    def update(self, boxes, voter: ResultVoter) -> List[Track]:
+        """
+        匹配本帧物品框, 返回本帧可见的轨迹, 新轨迹的投票器由voter复制
+        """
+        pairs = sorted(
+            (
+                (iou(track.box, box), i, j)
+                for i, track in enumerate(self.tracks)
+                for j, box in enumerate(boxes)
+            ),
+            reverse=True,
+        )
+        matched_tracks, matched_boxes = set(), set()
+        for score, i, j in pairs:
+            if score < self.iou_threshold:
+                break
+            if i in matched_tracks or j in matched_boxes:
+                continue
+            matched_tracks.add(i)
+            matched_boxes.add(j)
+            self.tracks[i].box = boxes[j]
+        for j, box in enumerate(boxes):
+            if j in matched_boxes:
+                continue
+            best, best_distance = None, self.max_distance
+            for i, track in enumerate(self.tracks):
+                if i in matched_tracks:
+                    continue
+                distance = centroid_distance(track.box, box)
+                if distance <= best_distance:
+                    best, best_distance = i, distance
+            if best is not None:
+                matched_tracks.add(best)
+                matched_boxes.add(j)
+                self.tracks[best].box = box
+        visible = []
+        for i, track in enumerate(self.tracks):
+            if i in matched_tracks:
+                track.misses = 0
+                visible.append(track)
+            else:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        for j, box in enumerate(boxes):
+            if j not in matched_boxes:
+                track = Track(next(self._ids), box, voter.clone())
+                self.tracks.append(track)
+                self.tracks_created += 1
+                visible.append(track)
+        return visible
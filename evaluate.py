@@ -0,0 +1,97 @@
+"""
+识别模型在标注样本集上的准确率/延迟报告, 用于对比FP32与INT8/FP16量化模型
+样本集目录结构: samples/<物品名称>/*.jpg, 图像为已裁剪的识别区域
+
+python evaluate.py samples --backend onnx --model model.onnx --model model_int8.onnx
+"""
+
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from frame_source import IMAGE_EXTS
+
+
+def load_samples(path: str, labels):
+    """
+    返回[(文件路径, 类别序号)], 不在labels中的目录忽略
+    """
+    samples = []
+    for name in sorted(os.listdir(path)):
+        folder = os.path.join(path, name)
+        if name not in labels or not os.path.isdir(folder):
+            continue
+        for file in sorted(os.listdir(folder)):
+            if file.lower().endswith(IMAGE_EXTS):
+                samples.append((os.path.join(folder, file), labels.index(name)))
+    return samples
+
+
+def load_image(file: str, config) -> np.ndarray:
+    # 路径含中文时cv2.imread在Windows上无法读取
+    image = cv2.imdecode(np.fromfile(file, dtype=np.uint8), cv2.IMREAD_COLOR)
+    image = cv2.resize(image, config.input_size, interpolation=cv2.INTER_AREA)
+    if config.order == "RGB":
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    return image
+
+
+def evaluate(classifier, path: str) -> dict:
+    """
+    逐张推理样本集, 统计top1准确率与单张推理耗时
+    """
+    config = classifier.config
+    samples = load_samples(path, config.labels)
+    latencies = []
+    correct = 0
+    confidence = 0.0
+    for file, label in samples:
+        image = load_image(file, config)
+        t0 = time.perf_counter()
+        scores = classifier.classify(image)[0]
+        latencies.append(time.perf_counter() - t0)
+        index = int(np.argmax(scores))
+        correct += index == label
+        confidence += float(scores[index])
+    n = len(samples)
+    lat = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "model": config.model,
+        "backend": config.backend,
+        "input_dtype": classifier.input_dtype,
+        "images": n,
+        "accuracy": round(correct / n, 4) if n else 0.0,
+        "mean_confidence": round(confidence / n, 4) if n else 0.0,
+        "latency_mean_ms": round(float(lat.mean()), 3),
+        "latency_p95_ms": round(float(np.percentile(lat, 95)), 3),
+    }
+
+
+def main():
+    from recognition import RecognitionConfig, create_classifier
+
+    parser = argparse.ArgumentParser(description="recognition model report")
+    parser.add_argument("samples", help="labeled sample directory")
+    parser.add_argument("--model", action="append", required=True)
+    parser.add_argument("--backend", default="opencv", choices=["opencv", "onnx"])
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+    for model in args.model:
+        config = RecognitionConfig(
+            backend=args.backend,
+            model=model,
+            threads_per_worker=args.threads,
+            warmup=args.warmup,
+        )
+        classifier = create_classifier(config)
+        classifier.warmup()
+        print(json.dumps(evaluate(classifier, args.samples), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+模拟控制器, 与FC_Controller的步进电机接口相同, 用于无硬件时测试分拣节拍
+运动时间按梯形速度曲线(速度/加速度/转角)计算, 每条指令附加串口往返延迟, 可注入故障
+"""
+
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("FC")  # 未拉取控制器SDK时使用
+
+
+class ControllerFault(IOError):
+    pass
+
+
+class _Motor:
+    def __init__(self, speed: float) -> None:
+        self.angle = 0.0  # 当前运动的起点
+        self.target = 0.0
+        self.speed = speed
+        self.start = 0.0
+        self.end = 0.0  # 运动结束时间(模拟时钟)
+
+
+class SimulatedController:
+    STEP1 = 1
+    STEP2 = 2
+
+    def __init__(
+        self,
+        rotation_speed=45.0,
+        acceleration=180.0,
+        latency=0.005,
+        jitter=0.002,
+        connect_time=0.5,
+        fault_rate=0.0,
+        fault_mode="error",
+        stall_factor=3.0,
+        time_scale=1.0,
+        seed=None,
+    ) -> None:
+        self.acceleration = acceleration  # 度/s^2, 0为无加减速
+        self.latency = latency  # 每条指令的串口往返延迟(s)
+        self.jitter = jitter
+        self.connect_time = connect_time
+        self.fault_rate = fault_rate  # 每条运动指令的故障概率
+        self.fault_mode = fault_mode  # error: 抛出异常, drop: 指令丢失, stall: 运动变慢
+        self.stall_factor = stall_factor
+        self.time_scale = time_scale  # 模拟加速倍数, 所有等待时间除以该值
+        self.connected = False
+        self.commands = 0
+        self.faults = 0
+        self._motors = {m: _Motor(rotation_speed) for m in (self.STEP1, self.STEP2)}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "SimulatedController":
+        return cls(**items)
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds / self.time_scale)
+
+    def _now(self) -> float:
+        return time.perf_counter() * self.time_scale
+
+    def _serial(self) -> None:
+        self.commands += 1
+        self._sleep(self.latency + self._random.uniform(0, self.jitter))
+
+    def _motors_in(self, mask: int):
+        return [m for motor_id, m in self._motors.items() if mask & motor_id]
+
+    def move_time(self, angle: float, speed: float) -> float:
+        """
+        梯形速度曲线的运动时间, 转角不足以加速到speed时为三角形曲线
+        """
+        angle = abs(angle)
+        if angle == 0 or speed <= 0:
+            return 0.0
+        a = self.acceleration
+        if a <= 0:
+            return angle / speed
+        if angle >= speed * speed / a:
+            return angle / speed + speed / a
+        return 2 * (angle / a) ** 0.5
+
+    def _position(self, motor: _Motor, now: float) -> float:
+        if now >= motor.end or motor.end == motor.start:
+            return motor.target
+        # 按时间线性插值, 足够用于中途改变目标
+        progress = (now - motor.start) / (motor.end - motor.start)
+        return motor.angle + (motor.target - motor.angle) * progress
+
+    ### 与FC_Controller相同的接口
+    def start_listen_serial(self, *args, **kwargs) -> None:
+        pass
+
+    def wait_for_connection(self, timeout: float = -1) -> bool:
+        self._sleep(self.connect_time)
+        self.connected = True
+        logger.info("Simulated controller connected")
+        return True
+
+    def step_set_speed(self, mask: int, speed: float) -> None:
+        self._serial()
+        with self._lock:
+            for motor in self._motors_in(mask):
+                motor.speed = speed
+
+    def step_rotate_abs(self, mask: int, angle: float) -> None:
+        self._serial()
+        factor = 1.0
+        if self.fault_rate and self._random.random() < self.fault_rate:
+            self.faults += 1
+            logger.warning(f"Simulated {self.fault_mode} fault on STEP mask {mask}")
+            if self.fault_mode == "error":
+                raise ControllerFault(f"step_rotate_abs({mask}, {angle}) failed")
+            if self.fault_mode == "drop":
+                return
+            factor = self.stall_factor
+        now = self._now()
+        with self._lock:
+            for motor in self._motors_in(mask):
+                motor.angle = self._position(motor, now)
+                motor.target = angle
+                motor.start = now
+                duration = self.move_time(angle - motor.angle, motor.speed) * factor
+                motor.end = now + duration
+
+    def step_busy(self, mask: int) -> bool:
+        now = self._now()
+        return any(now < m.end for m in self._motors_in(mask))
+
+    def wait_for_step_idle(self, mask: int, timeout: float = -1) -> bool:
+        """
+        与真实控制器一样轮询状态, 每次查询有串口延迟
+        """
+        deadline = None if timeout is None or timeout < 0 else self._now() + timeout
+        while True:
+            self._serial()
+            with self._lock:
+                end = max((m.end for m in self._motors_in(mask)), default=0.0)
+            now = self._now()
+            if now >= end:
+                return True
+            if deadline is not None and now >= deadline:
+                return False
+            self._sleep(min(end - now, 0.05))
+
+    def step_angle(self, motor_id: int) -> float:
+        with self._lock:
+            return self._position(self._motors[motor_id], self._now())
@@ -0,0 +1,207 @@
+import glob
+import os
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from camera import (
+    CameraConfig,
+    candidate_devices,
+    format_mode,
+    load_last_device,
+    negotiated_mode,
+    open_camera,
+    save_last_device,
+)
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """
+    帧来源接口, CaptureThread通过它取帧, 与具体设备解耦
+    """
+
+    name = "source"
+    finished = False  # 来源已耗尽(非循环回放结束), 不再尝试重连
+
+    def open(self) -> bool:
+        raise NotImplementedError
+
+    def isOpened(self) -> bool:
+        raise NotImplementedError
+
+    def read(self, out: Optional[np.ndarray] = None):
+        """
+        读取一帧, 与cv2.VideoCapture.read相同返回(ret, frame), 尽量写入out
+        """
+        raise NotImplementedError
+
+    def release(self) -> None:
+        pass
+
+    def describe(self) -> str:
+        return self.name
+
+
+class CameraSource(FrameSource):
+    """
+    cv2.VideoCapture摄像头, open时按上次成功的设备优先进行发现
+    """
+
+    name = "camera"
+
+    def __init__(
+        self, config: Optional[CameraConfig] = None, cache_file: str = "camera_cache.json"
+    ) -> None:
+        self.cam = cv2.VideoCapture()
+        self.config = CameraConfig() if config is None else config
+        self.cache_file = cache_file
+        self.device = None  # 当前打开的设备
+        self.mode = {}  # 实际协商得到的模式
+
+    def open_device(self, index) -> bool:
+        if not open_camera(self.cam, index, self.config):
+            return False
+        self.device = index
+        self.mode = negotiated_mode(self.cam)
+        return True
+
+    def open(self) -> bool:
+        if self.cam.isOpened():
+            return True
+        for index in candidate_devices(load_last_device(self.cache_file)):
+            if self.open_device(index):
+                save_last_device(self.cache_file, index)
+                return True
+        return False
+
+    def isOpened(self) -> bool:
+        return self.cam.isOpened()
+
+    def read(self, out: Optional[np.ndarray] = None):
+        return self.cam.read(out)
+
+    def release(self) -> None:
+        self.cam.release()
+
+    def describe(self) -> str:
+        if not self.mode:
+            return "camera"
+        return f"camera {self.device}: {format_mode(self.mode)}"
+
+
+class ReplaySource(FrameSource):
+    """
+    从视频文件/图片/图片目录回放帧
+    speed: 1为原速, 2为两倍速, 0为不限速
+    """
+
+    name = "replay"
+
+    def __init__(
+        self, path: str, speed: float = 1.0, loop: bool = True, fps: float = 30
+    ) -> None:
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.fps = fps  # 图片回放的原速帧率, 视频以文件帧率为准
+        self.finished = False
+        self.frames_read = 0
+        self._video: Optional[cv2.VideoCapture] = None
+        self._images: list = []
+        self._decoded = None
+        self._decoded_path = None
+        self._index = 0
+        self._next_t = 0.0
+        self._opened = False
+
+    def open(self) -> bool:
+        self.release()
+        self.finished = False
+        if os.path.isdir(self.path):
+            self._images = sorted(
+                p
+                for p in glob.glob(os.path.join(self.path, "*"))
+                if p.lower().endswith(IMAGE_EXTS)
+            )
+            self._opened = len(self._images) > 0
+        elif self.path.lower().endswith(IMAGE_EXTS):
+            self._images = [self.path] if os.path.isfile(self.path) else []
+            self._opened = len(self._images) > 0
+        else:
+            self._video = cv2.VideoCapture(self.path)
+            self._opened = self._video.isOpened()
+            if self._opened:
+                self.fps = self._video.get(cv2.CAP_PROP_FPS) or self.fps
+        self._index = 0
+        self._next_t = time.perf_counter()
+        return self._opened
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def _read_raw(self, out: Optional[np.ndarray]):
+        if self._video is not None:
+            ret, frame = self._video.read(out)
+            if not ret and self.loop:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self._video.read(out)
+            return ret, frame
+        if self._index >= len(self._images):
+            if not self.loop:
+                return False, None
+            self._index = 0
+        path = self._images[self._index]
+        self._index += 1
+        if path != self._decoded_path:  # 单张图片循环时只解码一次
+            self._decoded = cv2.imread(path)
+            self._decoded_path = path
+        if self._decoded is None:
+            return False, None
+        if out is not None and out.shape == self._decoded.shape:
+            np.copyto(out, self._decoded)
+            return True, out
+        return True, self._decoded.copy()
+
+    def read(self, out: Optional[np.ndarray] = None):
+        if not self._opened:
+            return False, None
+        if self.speed > 0:  # 按目标帧率节流
+            now = time.perf_counter()
+            if self._next_t > now:
+                time.sleep(self._next_t - now)
+            self._next_t = max(self._next_t, now) + 1 / (self.fps * self.speed)
+        ret, frame = self._read_raw(out)
+        if not ret:
+            self.finished = True
+            self._opened = False
+            return False, None
+        self.frames_read += 1
+        return True, frame
+
+    def release(self) -> None:
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        self._opened = False
+
+    def describe(self) -> str:
+        speed = "max" if self.speed <= 0 else f"x{self.speed:g}"
+        return f"replay {self.path} {self.fps:.1f}fps {speed}"
+
+
+def create_source(items: dict, camera_config=None) -> FrameSource:
+    """
+    根据settings.json中的"source"项创建帧来源
+    """
+    if items.get("type", "camera") == "replay":
+        return ReplaySource(
+            items["path"],
+            speed=items.get("speed", 1.0),
+            loop=items.get("loop", True),
+            fps=items.get("fps", 30),
+        )
+    return CameraSource(camera_config)
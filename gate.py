@@ -0,0 +1,121 @@
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from stats import LatencyStats
+
+
+class ChangeGate:
+    """
+    识别前的变化检测门限, 输入为缩小后的灰度帧
+    mode="background": 与缓慢更新的背景(空托盘)比较, 物品放上后持续放行
+    mode="previous": 与上一帧比较, 只在画面变化时放行
+    变化分数为平均绝对差(0~255), 超过threshold_on开始放行, 低于threshold_off停止
+    各视角位置的参考帧分别保存, 放行期间背景以active_learning_rate缓慢更新,
+    光照变化等持续的差异最终被吸收, 门限不会一直打开
+    已识别未分拣的物品由调用方传入hold=True冻结背景, 等待分拣期间不会被吸收
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        size=(64, 48),
+        mode="background",
+        threshold_on=8.0,
+        threshold_off=4.0,
+        pixel_threshold=25,
+        learning_rate=0.02,
+        active_learning_rate=0.002,
+        blur=True,
+        stats_window: int = 120,
+    ) -> None:
+        self.enabled = enabled
+        self.size = tuple(size)  # (w, h)
+        self.mode = mode
+        self.threshold_on = threshold_on
+        self.threshold_off = threshold_off
+        self.pixel_threshold = pixel_threshold  # 前景像素的最小灰度差
+        self.learning_rate = learning_rate
+        self.active_learning_rate = active_learning_rate
+        self.blur = blur
+        self.active = False
+        self.score = 0.0
+        self.frames_checked = 0
+        self.frames_passed = 0
+        self.gate_stats = LatencyStats("gate", stats_window)
+        self._references = {}  # {视角位置: 参考帧}
+        self._position = None
+        self._frame = np.empty((self.size[1], self.size[0]), dtype=np.float32)
+        self._diff = np.empty_like(self._frame)
+        self._mask = np.empty(self._frame.shape, dtype=np.uint8)
+
+    @classmethod
+    def from_dict(cls, items: dict, stats_window: int = 120) -> "ChangeGate":
+        return cls(**items, stats_window=stats_window)
+
+    @property
+    def pass_rate(self) -> float:
+        if self.frames_checked == 0:
+            return 1.0
+        return self.frames_passed / self.frames_checked
+
+    def foreground(self) -> Optional[tuple]:
+        """
+        上一帧与空托盘背景差异像素的外接框, 归一化(x, y, w, h)
+        仅background模式且门限打开时有效, 否则返回None
+        """
+        if self.mode != "background" or not self.active:
+            return None
+        cv2.threshold(
+            self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff
+        )
+        np.copyto(self._mask, self._diff, casting="unsafe")
+        x, y, w, h = cv2.boundingRect(self._mask)
+        if w == 0 or h == 0:
+            return None
+        fw, fh = self.size
+        return x / fw, y / fh, w / fw, h / fh
+
+    def reset(self) -> None:
+        self._references.clear()
+        self.active = False
+
+    def check(self, gray: np.ndarray, position=None, hold=False) -> bool:
+        """
+        判断该帧是否需要送去识别, position为视角位置, 首次看到某位置时假定托盘为空
+        hold: 放行期间不更新背景
+        """
+        if not self.enabled:
+            return True
+        t0 = time.perf_counter()
+        frame = self._frame
+        if self.blur:
+            cv2.GaussianBlur(gray, (5, 5), 0, dst=gray)
+        np.copyto(frame, gray, casting="unsafe")
+        if position != self._position:  # 托盘转动, 上一格的放行状态不再适用
+            self._position = position
+            self.active = False
+        reference = self._references.get(position)
+        if reference is None:
+            reference = self._references[position] = frame.copy()
+            self.score = 0.0
+        else:
+            cv2.absdiff(frame, reference, dst=self._diff)
+            self.score = float(self._diff.mean())
+        if self.active:
+            self.active = self.score >= self.threshold_off
+        else:
+            self.active = self.score >= self.threshold_on
+        if self.mode == "previous":
+            np.copyto(reference, frame)
+        elif not self.active:
+            cv2.accumulateWeighted(frame, reference, self.learning_rate)
+        elif self.active_learning_rate > 0 and not hold:  # 有物品时慢速更新
+            cv2.accumulateWeighted(frame, reference, self.active_learning_rate)
+        self.frames_checked += 1
+        if self.active:
+            self.frames_passed += 1
+        self.gate_stats.add(time.perf_counter() - t0)
+        return self.active
@@ -68,4 +68,8 @@ from . py_line_edit import PyLineEdit
 
 # PY TABLE WIDGET
 # ///////////////////////////////////////////////////////////////
-from . py_table_widget import PyTableWidget
\ No newline at end of file
+from . py_table_widget import PyTableWidget
+
+# PY VIDEO VIEW
+# ///////////////////////////////////////////////////////////////
+from . py_video_view import PyVideoView
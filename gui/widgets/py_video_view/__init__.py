@@ -0,0 +1,3 @@
+# PY VIDEO VIEW
+# ///////////////////////////////////////////////////////////////
+from . py_video_view import PyVideoView
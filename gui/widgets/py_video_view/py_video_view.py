@@ -0,0 +1,78 @@
+# IMPORT QT CORE
+# ///////////////////////////////////////////////////////////////
+import time
+
+from qt_core import *
+from PySide6.QtOpenGLWidgets import QOpenGLWidget
+
+
+# OPENGL VIDEO VIEW
+# Frames are drawn through QPainter's OpenGL paint engine: the image is
+# uploaded as a texture and scaled on the GPU (or Mesa llvmpipe), the
+# overlay text is drawn as vector glyphs on top of it.
+# ///////////////////////////////////////////////////////////////
+class PyVideoView(QOpenGLWidget):
+    def __init__(
+        self,
+        parent=None,
+        bg_color="#000000",
+        text_color="#FFFF00",
+        font_family="更纱黑体 UI SC",
+        font_size=12,
+    ):
+        QOpenGLWidget.__init__(self, parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        # CUSTOM PROPERTIES
+        self.bg_color = QColor(bg_color)
+        self.text_color = QColor(text_color)
+        self.overlay_font = QFont(font_family, font_size)
+        self.overlay = []
+        self.paint_time = 0.0  # ms
+
+        # CURRENT FRAME
+        # The array is kept alive as long as the QImage wraps it
+        self._image = None
+        self._array = None
+
+    # SET IMAGE (numpy HxWx3 array, no copy)
+    def set_image(self, array, image_format=QImage.Format.Format_BGR888):
+        self._array = array
+        self._image = QImage(
+            array, array.shape[1], array.shape[0], array.strides[0], image_format
+        )
+        self.update()
+
+    # SET OVERLAY TEXT LINES
+    def set_overlay(self, lines):
+        self.overlay = lines
+
+    # QLABEL COMPATIBILITY
+    def setPixmap(self, pixmap):
+        self._array = None
+        self._image = pixmap.toImage()
+        self.update()
+
+    def setText(self, text):
+        self.set_overlay([text] if text else [])
+        self.update()
+
+    # PAINT
+    def paintGL(self):
+        t0 = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.bg_color)
+        if self._image is not None and not self._image.isNull():
+            size = self._image.size().scaled(self.size(), Qt.KeepAspectRatio)
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(self.rect().center())
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(target, self._image)
+        if self.overlay:
+            painter.setFont(self.overlay_font)
+            painter.setPen(self.text_color)
+            line_height = painter.fontMetrics().height()
+            for i, line in enumerate(self.overlay):
+                painter.drawText(10, 10 + line_height * (i + 1), line)
+        painter.end()
+        self.paint_time = (time.perf_counter() - t0) * 1000
@@ -0,0 +1,27 @@
+emoji = {
+    "1号电池": "🔋",
+    "2号电池": "🔋",
+    "5号电池": "🔋",
+    "过期药物": "💊",
+    "易拉罐": "🥤",
+    "矿泉水瓶": "🥤",
+    "小土豆": "🥔",
+    "白萝卜": "🥕",
+    "胡萝卜": "🥕",
+    "瓷片": "🍽️",
+    "鹅卵石": "🗿",
+}
+category = {
+    "1号电池": "有害垃圾",
+    "2号电池": "有害垃圾",
+    "5号电池": "有害垃圾",
+    "过期药物": "有害垃圾",
+    "易拉罐": "可回收垃圾",
+    "矿泉水瓶": "可回收垃圾",
+    "小土豆": "厨余垃圾",
+    "白萝卜": "厨余垃圾",
+    "胡萝卜": "厨余垃圾",
+    "瓷片": "其他垃圾",
+    "鹅卵石": "其他垃圾",
+}
+item_list = list(category.keys())
@@ -0,0 +1,115 @@
+import queue
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from stats import LatencyStats, PipelineStats
+
+
+class SortCycle:
+    """
+    分拣流程: 识别视角位置的物品 -> 转到下一格 -> 投放, 循环
+    依赖关系: 识别提交后托盘才能转动, 转动完成后才能识别下一个物品, 上一次投放完成后才能转动
+    顺序模式下投放完成后才开始识别下一个物品
+    流水线模式下转动完成即开始识别, 投放与下一个物品的识别同时进行
+    rotate/release为返回Future的运动函数, on_ready在可以开始成像时调用, 识别结果通过put送入
+    """
+
+    def __init__(
+        self,
+        rotate: Callable[[], Future],
+        release: Callable[[], Future],
+        on_ready: Optional[Callable[[], None]] = None,
+        pipelined=True,
+        stats_window: int = 120,
+        on_status: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.rotate = rotate
+        self.release = release
+        self.on_ready = on_ready
+        self.pipelined = pipelined
+        self.on_status = on_status
+        self.results = queue.Queue()
+        self.items_sorted = 0
+        self.cycle_stats = PipelineStats("sort", stats_window)
+        self.recognize_stats = LatencyStats("recognize", stats_window)
+        self.rotate_stats = LatencyStats("rotate", stats_window)
+        self.release_stats = LatencyStats("release", stats_window)
+
+    def put(self, result) -> None:
+        self.results.put(result)
+
+    def clear(self) -> None:
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                return
+
+    def ready(self) -> None:
+        """
+        托盘静止, 丢弃之前的结果并开始识别视角位置的物品
+        """
+        self.clear()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def status(self, text: str) -> None:
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def run(self, items: Optional[int] = None) -> None:
+        """
+        分拣items个物品后返回, None为一直运行
+        """
+        release: Optional[Future] = None
+        sorted_items = 0
+        self.ready()
+        try:
+            while items is None or sorted_items < items:
+                self.status("等待物品")
+                t0 = time.perf_counter()
+                result = self.results.get()
+                self.recognize_stats.add(time.perf_counter() - t0)
+                if release is not None:
+                    release.result()
+                self.status(f"正在分拣 {result.name}")
+                self.rotate_stats.add(self.rotate().result())
+                release = self.release()
+                release.add_done_callback(self._on_released)
+                if not self.pipelined:
+                    release.result()
+                self.ready()
+                sorted_items += 1
+                self.items_sorted += 1
+                self.cycle_stats.tick()
+        finally:
+            if release is not None:
+                release.result()
+
+    def _on_released(self, future: Future) -> None:
+        if future.exception() is None:
+            self.release_stats.add(future.result())
+
+    @property
+    def items_per_minute(self) -> float:
+        return self.cycle_stats.fps * 60
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": "pipelined" if self.pipelined else "sequential",
+            "items": self.items_sorted,
+            "items_per_min": round(self.items_per_minute, 2),
+            "cycle_p50_s": round(self.cycle_stats.percentile(50) / 1000, 3),
+            "recognize_s": round(self.recognize_stats.mean / 1000, 3),
+            "rotate_s": round(self.rotate_stats.mean / 1000, 3),
+            "release_s": round(self.release_stats.mean / 1000, 3),
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"{s['items']} items, {s['items_per_min']:.1f} items/min ({s['mode']}), "
+            f"cycle {s['cycle_p50_s']:.2f}s, recognize {s['recognize_s']:.2f}s, "
+            f"rotate {s['rotate_s']:.2f}s, release {s['release_s']:.2f}s"
+        )
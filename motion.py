@@ -0,0 +1,211 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class MotionPlan:
+    def __init__(self, targets: dict, speeds: dict, duration: float, angles: dict):
+        self.targets = targets  # {电机: 绝对角度}, 只包含需要转动的电机
+        self.speeds = speeds  # {电机: 速度(度/s)}, 按转角缩放使各电机同时到达
+        self.duration = duration  # 预计运动耗时(s)
+        self.angles = angles  # 运动完成后全部电机的绝对角度
+
+    def __repr__(self) -> str:
+        return f"MotionPlan({self.targets}, {self.duration:.2f}s)"
+
+
+class CarouselPlanner:
+    """
+    六格转盘运动规划, 目标格位按最短方向(或directions限定的方向)展开为连续的绝对角度
+    多个电机按最大转角统一运动时长, 同时启动同时到达
+    """
+
+    def __init__(self, positions=6, speed=45.0, directions=None, settle=0.1) -> None:
+        self.step = 360 / positions
+        self.speed = speed  # 转角最大的电机的速度(度/s)
+        self.directions = {} if directions is None else directions  # {电机: 1正转/-1反转}
+        self.settle = settle  # 加减速与指令往返的额外耗时(s)
+
+    def delta(self, motor, angle: float, slot: int) -> float:
+        forward = round((slot * self.step - angle) % 360, 6)
+        direction = self.directions.get(motor, 0)
+        if direction > 0:
+            return forward
+        if direction < 0:
+            return forward - 360 if forward else 0.0
+        return forward if forward <= 180 else forward - 360
+
+    def plan(self, angles: dict, slots: dict) -> MotionPlan:
+        """
+        angles: 当前绝对角度, slots: {电机: 目标格位}
+        """
+        deltas = {m: self.delta(m, angles.get(m, 0.0), s) for m, s in slots.items()}
+        deltas = {m: d for m, d in deltas.items() if d}
+        end = dict(angles)
+        for motor, d in deltas.items():
+            end[motor] = angles.get(motor, 0.0) + d
+        if not deltas:
+            return MotionPlan({}, {}, 0.0, end)
+        longest = max(abs(d) for d in deltas.values())
+        speeds = {m: self.speed * abs(d) / longest for m, d in deltas.items()}
+        targets = {m: end[m] for m in deltas}
+        return MotionPlan(targets, speeds, longest / self.speed + self.settle, end)
+
+
+class _Move:
+    def __init__(self, slots: dict, angles: dict) -> None:
+        self.slots = slots
+        self.angles = angles  # 运动开始时的绝对角度
+        self.future: Future = Future()
+        self.plan: Optional[MotionPlan] = None
+        self.started = False
+
+
+class Motion:
+    """
+    步进电机运动层, 运动指令在单独线程按提交顺序执行, 每次运动立即返回Future
+    调用方继续采集/识别/更新界面, 只在后续步骤依赖运动完成时才等待future.result()
+    尚未开始执行的运动与新提交的运动合并为一次, 共用同一个Future
+    future.plan为运动规划, 含预计耗时
+    预计耗时按实际耗时与规划耗时之比的滑动平均修正, 运动开始时通过on_start通知
+    """
+
+    def __init__(
+        self,
+        api,
+        planner: Optional[CarouselPlanner] = None,
+        on_start: Optional[Callable[[float], None]] = None,
+        learning_rate=0.2,
+        live_progress=True,
+    ) -> None:
+        self.api = api
+        self.planner = CarouselPlanner() if planner is None else planner
+        self.on_start = on_start  # 参数为预计耗时(s)
+        self.learning_rate = learning_rate
+        # 控制器可查询电机角度(step_angle)时按实际角度计算进度
+        self.live_progress = live_progress and hasattr(api, "step_angle")
+        self.time_ratio = 1.0  # 实际耗时/规划耗时
+        self.moves = 0
+        self.coalesced = 0  # 被合并的运动次数
+        self.angles = {}  # 全部已提交运动完成后的绝对角度
+        self._speeds = {}  # 控制器当前的电机速度, 变化时才下发
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="Motion")
+        self._last: Optional[Future] = None
+        self._pending: Optional[_Move] = None
+        self._current = None  # (运动, 开始时间, 预计耗时)
+        self._lock = threading.Lock()
+
+    def rotate(self, slots: dict, coalesce=True) -> Future:
+        """
+        slots: {电机: 目标格位}, 所有电机同时到达, 结果为实际运动耗时(s)
+        coalesce=False时必须实际到达该位置(如投放), 不与前后的运动合并
+        """
+        with self._lock:
+            move = self._pending
+            if coalesce and move is not None and not move.started:
+                move.slots.update(slots)
+                self.coalesced += 1
+            else:
+                move = _Move(dict(slots), dict(self.angles))
+                self._pending = move if coalesce else None
+                self.moves += 1
+                self._last = move.future
+                self._executor.submit(self._run, move)
+            move.plan = self.planner.plan(move.angles, move.slots)
+            move.future.plan = move.plan
+            self.angles = move.plan.angles
+        return move.future
+
+    def _run(self, move: _Move) -> None:
+        with self._lock:
+            move.started = True
+            if self._pending is move:
+                self._pending = None
+        if not move.future.set_running_or_notify_cancel():
+            return
+        try:
+            move.future.set_result(self._execute(move))
+        except Exception as e:
+            move.future.set_exception(e)
+        finally:
+            self._current = None
+
+    def _execute(self, move: _Move) -> float:
+        t0 = time.perf_counter()
+        plan = move.plan
+        if not plan.targets:
+            return 0.0
+        expected = self.expected(plan)
+        self._current = (move, t0, expected)
+        if self.on_start is not None:
+            self.on_start(expected)
+        mask = 0
+        for motor, speed in plan.speeds.items():
+            if self._speeds.get(motor) != speed:
+                self.api.step_set_speed(motor, speed)
+                self._speeds[motor] = speed
+        for motor, angle in plan.targets.items():
+            self.api.step_rotate_abs(motor, angle)
+            mask |= motor
+        self.api.wait_for_step_idle(mask)
+        elapsed = time.perf_counter() - t0
+        if plan.duration > 0:
+            ratio = elapsed / plan.duration
+            self.time_ratio += self.learning_rate * (ratio - self.time_ratio)
+        return elapsed
+
+    def expected(self, plan: MotionPlan) -> float:
+        """
+        按历史实际耗时修正后的预计耗时(s)
+        """
+        return plan.duration * self.time_ratio
+
+    @property
+    def moving(self) -> bool:
+        return self._current is not None
+
+    def progress(self) -> float:
+        """
+        正在执行的运动的完成比例0~1, 没有运动时为1
+        可查询电机角度时取各电机已转过角度比例的最小值, 否则按已用时间/预计耗时, 到达前不超过0.99
+        """
+        current = self._current
+        if current is None:
+            return 1.0
+        move, t0, expected = current
+        if self.live_progress:
+            progress = 1.0
+            for motor, target in move.plan.targets.items():
+                start = move.angles.get(motor, 0.0)
+                done = (self.api.step_angle(motor) - start) / (target - start)
+                progress = min(progress, done)
+            return min(max(progress, 0.0), 1.0)
+        if expected <= 0:
+            return 0.99
+        return min((time.perf_counter() - t0) / expected, 0.99)
+
+    def call(self, func, *args) -> Future:
+        """
+        其他控制器指令与运动指令排队执行, 保证顺序
+        """
+        with self._lock:
+            future = self._executor.submit(func, *args)
+            self._last = future
+            self._pending = None  # 之后的运动不能合并到该指令之前
+        return future
+
+    @property
+    def busy(self) -> bool:
+        return self._last is not None and not self._last.done()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        等待已提交的全部运动完成
+        """
+        last = self._last
+        if last is not None:
+            last.result(timeout)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,754 @@
+import multiprocessing
+import threading
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from cache import RecognitionCache
+from capture import FramePool
+from detection import BlobDetector, IoUTracker, Track
+from gate import ChangeGate
+from labels import category, item_list
+from stats import Histogram, LatencyStats, PipelineStats
+from voting import ResultVoter
+
+
+class RecognitionConfig:
+    """
+    识别配置, 对应settings.json中的"recognition"项
+    """
+
+    def __init__(
+        self,
+        enabled=False,
+        mode="classify",
+        backend="opencv",
+        model="",
+        labels=None,
+        input_size=(224, 224),
+        order="RGB",
+        scale=1 / 255,
+        mean=(0.485, 0.456, 0.406),
+        std=(0.229, 0.224, 0.225),
+        workers=2,
+        threads_per_worker=1,
+        max_batch=1,
+        max_wait=0.02,
+        max_age=0.5,
+        start_method="spawn",
+        threshold=0.6,
+        softmax=True,
+        rois=None,
+        warmup=3,
+        samples="",
+    ) -> None:
+        self.enabled = enabled
+        self.mode = mode  # classify: 整个识别区域分类, detect: 检测多个物品并跟踪
+        self.backend = backend
+        self.model = model
+        self.labels = list(item_list if labels is None else labels)
+        self.input_size = tuple(input_size)  # (w, h)
+        self.order = order
+        self.scale = scale
+        self.mean = tuple(mean)
+        self.std = tuple(std)
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_batch = max_batch  # 一次推理的最大帧数, 模型需支持动态batch
+        self.max_wait = max_wait  # 凑批的最长等待时间(s), 超时后不满也提交
+        self.max_age = max_age  # 结果相对帧采集时间的最大延迟(s), 预计超出的帧不再推理
+        self.start_method = start_method
+        self.threshold = threshold
+        self.softmax = softmax  # 模型输出为logits时需要softmax
+        self.warmup = warmup  # 启动时空跑的推理次数, 避免第一个物品承担冷启动耗时
+        self.samples = samples  # 标注样本集目录, 启动后自动生成准确率/延迟报告
+        # 各视角位置的识别区域, 归一化的[x, y, w, h], 键为sight_pos, 无配置时使用全图
+        self.rois = {} if rois is None else {str(k): v for k, v in rois.items()}
+
+    def roi_for(self, position, shape):
+        """
+        position对应的像素区域(x, y, w, h), 未配置时返回None
+        """
+        roi = self.rois.get(str(position), self.rois.get("default"))
+        if roi is None:
+            return None
+        h, w = shape[:2]
+        x0 = min(max(int(roi[0] * w), 0), w - 1)
+        y0 = min(max(int(roi[1] * h), 0), h - 1)
+        x1 = min(max(int((roi[0] + roi[2]) * w), x0 + 1), w)
+        y1 = min(max(int((roi[1] + roi[3]) * h), y0 + 1), h)
+        return x0, y0, x1 - x0, y1 - y0
+
+    @classmethod
+    def from_dict(cls, items: dict) -> "RecognitionConfig":
+        return cls(**items)
+
+
+class Recognition:
+    def __init__(
+        self, seq, timestamp, index, name, confidence, latency, track_id=None, box=None
+    ) -> None:
+        self.seq = seq
+        self.timestamp = timestamp  # 帧采集时间
+        self.index = index
+        self.name = name
+        self.category = category.get(name, "其他垃圾")
+        self.confidence = confidence
+        self.latency = latency  # 模型推理耗时(s)
+        self.track_id = track_id  # 检测模式下的轨迹编号
+        self.box = box  # 检测模式下物品框, 识别区域内归一化的(x, y, w, h)
+
+
+def softmax(x: np.ndarray) -> np.ndarray:
+    x = x - x.max(axis=-1, keepdims=True)
+    e = np.exp(x)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class Classifier:
+    """
+    CPU分类模型, 输入为已裁剪缩放到input_size的NHWC uint8图像(通道顺序由config.order指定)
+    一批图像整体归一化为一个NCHW张量, 一次推理输出各图像的类别概率
+    """
+
+    input_dtype = "float32"
+
+    def __init__(self, config: RecognitionConfig) -> None:
+        self.config = config
+        w, h = config.input_size
+        std = np.array(config.std, dtype=np.float32).reshape(3, 1, 1)
+        mean = np.array(config.mean, dtype=np.float32).reshape(3, 1, 1)
+        # (x * scale - mean) / std = x * alpha - beta
+        self._alpha = np.float32(config.scale) / std
+        self._beta = mean / std
+        self._tensor = np.empty((config.max_batch, 3, h, w), dtype=np.float32)
+
+    def preprocess(self, images: np.ndarray) -> np.ndarray:
+        """
+        原地写入预分配的NCHW张量, 返回前len(images)个
+        """
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        w, h = self.config.input_size
+        if images.shape[1:3] != (h, w):
+            images = np.stack(
+                [cv2.resize(i, (w, h), interpolation=cv2.INTER_AREA) for i in images]
+            )
+        if len(images) > len(self._tensor):
+            self._tensor = np.empty((len(images), 3, h, w), dtype=np.float32)
+        nchw = self._tensor[: len(images)]
+        np.multiply(images.transpose(0, 3, 1, 2), self._alpha, out=nchw)
+        np.subtract(nchw, self._beta, out=nchw)
+        return nchw
+
+    def forward(self, blob: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def classify(self, images: np.ndarray) -> np.ndarray:
+        """
+        返回(N, 类别数)的概率
+        """
+        blob = self.preprocess(images)
+        scores = self.forward(blob).reshape(len(blob), -1)
+        return softmax(scores) if self.config.softmax else scores
+
+    def warmup(self) -> float:
+        """
+        用空白图像推理config.warmup次, 完成内存分配/图优化/权重加载, 返回耗时(s)
+        """
+        t0 = time.perf_counter()
+        w, h = self.config.input_size
+        batch_sizes = {1, self.config.max_batch}  # 动态batch的每种形状都需要预热
+        for n in batch_sizes:
+            images = np.zeros((n, h, w, 3), dtype=np.uint8)
+            for _ in range(self.config.warmup):
+                self.classify(images)
+        return time.perf_counter() - t0
+
+
+class CvDnnClassifier(Classifier):
+    def __init__(self, config: RecognitionConfig) -> None:
+        super().__init__(config)
+        cv2.setNumThreads(config.threads_per_worker)
+        self.net = cv2.dnn.readNet(config.model)
+
+    def forward(self, blob: np.ndarray) -> np.ndarray:
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+class OnnxClassifier(Classifier):
+    """
+    支持INT8(QDQ/QOperator)与FP16量化模型, FP16模型的输入按模型类型转换
+    """
+
+    def __init__(self, config: RecognitionConfig) -> None:
+        super().__init__(config)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = config.threads_per_worker
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            config.model, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        if model_input.type == "tensor(float16)":
+            self.input_dtype = "float16"
+
+    def forward(self, blob: np.ndarray) -> np.ndarray:
+        blob = blob.astype(self.input_dtype, copy=False)
+        scores = self.session.run(None, {self.input_name: blob})[0]
+        return scores.astype(np.float32, copy=False)
+
+
+BACKENDS = {
+    "opencv": CvDnnClassifier,
+    "onnx": OnnxClassifier,
+}
+
+
+def create_classifier(config: RecognitionConfig) -> Classifier:
+    return BACKENDS[config.backend](config)
+
+
+### 子进程
+_classifier: Optional[Classifier] = None
+_init_error: Optional[Exception] = None
+_warmup_time = 0.0
+
+
+def _init_worker(config: RecognitionConfig) -> None:
+    # 初始化异常会导致进程池反复重启子进程, 这里记下异常在推理时抛出
+    global _classifier, _init_error, _warmup_time
+    try:
+        t0 = time.perf_counter()
+        classifier = create_classifier(config)
+        classifier.warmup()  # 预热失败(如模型固定批大小与max_batch不符)同样视为初始化失败
+        _warmup_time = time.perf_counter() - t0
+        _classifier = classifier
+    except Exception as e:
+        _init_error = e
+
+
+def _warmup() -> float:
+    """
+    子进程初始化(加载+预热)完成后返回耗时
+    """
+    if _classifier is None:
+        raise RuntimeError(f"classifier init failed: {_init_error!r}")
+    return _warmup_time
+
+
+def _evaluate(path: str) -> dict:
+    from evaluate import evaluate
+
+    return evaluate(_classifier, path)
+
+
+def _classify(images: np.ndarray, deadline: Optional[float] = None):
+    """
+    deadline为perf_counter时间(系统单调时钟, 跨进程可比), 开始推理时已过期则返回None
+    """
+    if _classifier is None:
+        raise RuntimeError(f"classifier init failed: {_init_error!r}")
+    t0 = time.perf_counter()
+    if deadline is not None and t0 > deadline:
+        return None
+    scores = _classifier.classify(images)
+    return scores, time.perf_counter() - t0
+
+
+class _Batch:
+    """
+    凑批中的输入, 帧直接读入池化的(max_batch, h, w, 3)缓冲
+    """
+
+    def __init__(self, frame, deadline: float, position) -> None:
+        self.frame = frame
+        self.deadline = deadline
+        self.position = position
+        self.start = 0  # 丢弃过期帧后有效输入在缓冲中的起点
+        self.seqs = []
+        self.timestamps = []
+        self.keys = []  # 各帧识别区域的感知哈希, 推理完成后写入缓存
+        self.tracks = []  # 检测模式下各裁剪图所属的轨迹
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    @property
+    def images(self) -> np.ndarray:
+        return self.frame.array[self.start : self.start + len(self.seqs)]
+
+    def drop_before(self, cutoff: float) -> list:
+        """
+        丢弃采集时间早于cutoff的帧(按时间顺序在前), 返回被丢弃帧的轨迹
+        """
+        n = 0
+        while n < len(self.timestamps) and self.timestamps[n] < cutoff:
+            n += 1
+        dropped = self.tracks[:n]
+        self.start += n
+        del self.seqs[:n], self.timestamps[:n], self.keys[:n], self.tracks[:n]
+        return dropped
+
+
+class RecognitionEngine(threading.Thread):
+    """
+    从采集环形缓冲取帧, 在进程池中推理, 推理不占用界面/采集线程的GIL
+    每帧先经过变化检测门限, 放行的帧在有空闲进程时送去推理, 不会积压
+    推理结果经时间投票, 每个物品只通过on_result提交一次, 提交后到场景变化前不再推理
+    max_batch > 1时连续帧凑成一批推理, 凑满或等待max_wait后提交
+    识别区域的感知哈希命中缓存时直接使用缓存结果, 不经过模型
+    mode="detect"时检测识别区域内的多个物品并跟踪, 每条轨迹的裁剪图推理到投票提交为止
+    总是取最新帧推理, 预计在max_age内无法完成的帧直接丢弃, 过载时延迟有上限而不是排队增长
+    托盘转动期间调用pause暂停, 转动完成后resume, 转动中采集的帧不参与投票
+    """
+
+    def __init__(
+        self,
+        capture,
+        config: RecognitionConfig,
+        stats_window: int = 120,
+        gate: Optional[ChangeGate] = None,
+        voter: Optional[ResultVoter] = None,
+        cache: Optional[RecognitionCache] = None,
+        detector: Optional[BlobDetector] = None,
+        tracker: Optional[IoUTracker] = None,
+    ) -> None:
+        super().__init__(name="RecognitionEngine", daemon=True)
+        self.capture = capture
+        self.config = config
+        self.gate = ChangeGate(enabled=False) if gate is None else gate
+        self.voter = ResultVoter(threshold=config.threshold) if voter is None else voter
+        self.cache = RecognitionCache(enabled=False) if cache is None else cache
+        self._hash_image = np.empty(self.cache.size[::-1], dtype=np.uint8)
+        self.detector = BlobDetector() if detector is None else detector
+        self.tracker = IoUTracker() if tracker is None else tracker
+        self._detect_image = np.empty(self.detector.size[::-1], dtype=np.uint8)
+        self.on_result: Optional[Callable[[Recognition], None]] = None
+        self.stats = PipelineStats("recognition", stats_window)
+        self.inference_stats = LatencyStats("inference", stats_window)
+        self.latency_stats = LatencyStats("end_to_end", stats_window)
+        self.errors = 0
+        self.batches = 0
+        self.images = 0  # 已推理的图像数, images / batches为平均批大小
+        self.frames_suppressed = 0  # 已提交结果后跳过推理的帧数
+        self.frames_stale = 0  # 超过max_age或托盘已转动而丢弃的帧数
+        self.staleness = Histogram("staleness")  # 结果相对帧采集时间的延迟分布
+        self.last_error: Optional[BaseException] = None
+        self.last_result: Optional[Recognition] = None
+        self.ready = threading.Event()  # 模型已加载并预热
+        self.warmup_time = 0.0
+        self.report: Optional[dict] = None  # 样本集准确率/延迟报告
+        self.on_report: Optional[Callable[[dict], None]] = None
+        self._position = None  # 当前视角位置(sight_pos), 用于选择识别区域
+        self._paused = False
+        self._resumed_at = 0.0  # 早于该时间采集的帧在托盘静止前, 结果丢弃
+        self._pool = None
+        self._slots = threading.Semaphore(config.workers)
+        # 送往子进程的输入缓冲, 序列化完成前不能复用, 推理完成后归还
+        self._inputs = FramePool(config.workers + 1)
+        self._running = threading.Event()
+        self._lock = threading.Lock()
+        self._last_seq = -1
+        self._batch: Optional[_Batch] = None
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value) -> None:
+        if value != self._position:  # 托盘转动, 视野中已是另一个物品
+            self._position = value
+            self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.voter.reset()
+            self.tracker.reset()
+
+    def reset_background(self) -> None:
+        """
+        重新学习各位置的空托盘背景, 摄像头重新连接后画面可能已变化
+        """
+        self.gate.reset()
+        self.detector.reset()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def pause(self) -> None:
+        """
+        托盘开始转动, 停止推理, 进行中的推理结果丢弃
+        """
+        self._paused = True
+        self.reset()
+
+    def resume(self) -> None:
+        """
+        托盘已静止, 只接受此后采集的帧
+        """
+        self._resumed_at = time.perf_counter()
+        self._paused = False
+        self.reset()
+
+    def run(self) -> None:
+        ctx = multiprocessing.get_context(self.config.start_method)
+        self._pool = ctx.Pool(
+            self.config.workers, initializer=_init_worker, initargs=(self.config,)
+        )
+        # 子进程在后台加载并预热模型, 期间界面与校准照常进行
+        self._pool.apply_async(
+            _warmup, callback=self._on_ready, error_callback=self._on_init_error
+        )
+        self._running.set()
+        seq = -1
+        while self._running.is_set():
+            timeout = 0.1
+            if self._batch is not None:
+                timeout = max(self._batch.deadline - time.perf_counter(), 0)
+            fresh = accepted = False
+            if self._paused:  # 托盘转动中的帧不检测也不推理
+                if self.capture.ring.wait(seq, timeout=timeout):
+                    seq = self.capture.ring.seq
+            elif self.gate.enabled:
+                ret = self.capture.next_after(
+                    seq, timeout=timeout, order="GRAY", size=self.gate.size
+                )
+                if ret is not None:
+                    seq, _, small = ret
+                    fresh = True
+                    accepted = self._check(small)
+            elif self.capture.ring.wait(seq, timeout=timeout):
+                seq = self.capture.ring.seq
+                fresh = True
+                accepted = not self._suppressed()
+            if accepted:  # 门限检查期间可能已有更新的帧, 总是推理最新帧
+                seq = max(seq, self.capture.ring.seq)
+            if self.config.mode == "detect":
+                # 门限关闭的帧也要检测, 用于更新空托盘背景
+                if fresh:
+                    self._track(seq, accepted)
+            elif accepted:
+                self._recognize(seq)
+            batch = self._batch
+            if batch is not None and (
+                len(batch) >= self.config.max_batch
+                or time.perf_counter() >= batch.deadline
+            ):
+                self._submit()
+        if self._batch is not None:
+            self._batch.frame.release()
+            self._slots.release()
+        self._pool.terminate()
+
+    def _check(self, small: np.ndarray) -> bool:
+        """
+        门限与投票判断该帧是否需要推理
+        """
+        # 已提交结果的物品等待分拣, 冻结背景直到托盘转动(reset)
+        hold = self.voter.committed is not None or any(
+            track.classified for track in self.tracker.tracks
+        )
+        if not self.gate.check(small, self.position, hold):  # 托盘已空, 重新投票
+            self.reset()
+            return False
+        return not self._suppressed()
+
+    def _suppressed(self) -> bool:
+        """
+        已提交结果后到场景变化前不再推理, 门限关闭时到托盘转动(reset)前不再推理
+        """
+        if self.config.mode == "classify" and self.voter.committed is not None:
+            self.frames_suppressed += 1
+            return True
+        return False
+
+    def _roi(self):
+        roi = self.config.roi_for(self.position, self.capture.ring.shape)
+        if roi is None:
+            h, w = self.capture.ring.shape[:2]
+            roi = (0, 0, w, h)
+        return roi
+
+    def _recognize(self, seq: int) -> None:
+        key = None
+        if self.cache.enabled:
+            key, miss = self._lookup(seq)
+            if not miss:
+                return
+        if self._begin_batch():
+            self._read(seq, self._roi(), key=key)
+
+    def _foreground(self):
+        """
+        识别区域内与门限背景不同的部分(像素坐标), 无法确定前景时返回None
+        """
+        box = self.gate.foreground() if self.gate.enabled else None
+        if box is None:
+            return None
+        h, w = self.capture.ring.shape[:2]
+        bx, by, bw, bh = box
+        x0, y0 = int(bx * w), int(by * h)
+        x1, y1 = int((bx + bw) * w), int((by + bh) * h)
+        rx, ry, rw, rh = self._roi()
+        x0, y0 = max(x0, rx), max(y0, ry)
+        x1, y1 = min(x1, rx + rw), min(y1, ry + rh)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _lookup(self, seq: int):
+        """
+        计算前景物品的感知哈希并查缓存, 命中时直接提交缓存结果
+        返回(键, 是否需要推理), 无法确定前景时不使用缓存
+        """
+        box = self._foreground()
+        if box is None:
+            return None, True
+        ret = self.capture.ring.read(
+            seq, self._hash_image, "GRAY", self.cache.size, box
+        )
+        if ret is None:
+            return None, False
+        _, timestamp, gray = ret
+        key = self.cache.key(gray, self.position)
+        scores = self.cache.get(key)
+        if scores is None:
+            return key, True
+        self._emit(seq, timestamp, scores, 0.0)
+        return key, False
+
+    def _track(self, seq: int, accepted: bool) -> None:
+        """
+        检测识别区域内的物品并更新轨迹, 未完成分类的轨迹裁剪物品框送去推理
+        已分类的轨迹沿用之前的结果, 不再推理
+        """
+        roi = self._roi()
+        ret = self.capture.ring.read(
+            seq, self._detect_image, "GRAY", self.detector.size, roi
+        )
+        if ret is None:
+            return
+        boxes = self.detector.detect(ret[2], self.position)
+        if not accepted:
+            return
+        with self._lock:
+            tracks = self.tracker.update(boxes, self.voter)
+        x, y, w, h = roi
+        for track in tracks:
+            if track.classified or track.pending:
+                continue
+            if not self._begin_batch():  # 进程全忙, 下一帧再推理
+                break
+            bx, by, bw, bh = track.box
+            box = (
+                x + int(bx * w),
+                y + int(by * h),
+                max(int(bw * w), 1),
+                max(int(bh * h), 1),
+            )
+            track.pending = self._read(seq, box, track=track)
+            if len(self._batch) >= self.config.max_batch:
+                self._submit()
+
+    def _begin_batch(self) -> bool:
+        """
+        确保有凑批中的输入, 进程全忙或缓冲用尽时返回False
+        """
+        if self._batch is not None:
+            return True
+        if not self._slots.acquire(blocking=False):  # 进程全忙, 等下一帧
+            return False
+        w, h = self.config.input_size
+        frame = self._inputs.acquire((self.config.max_batch, h, w, 3))
+        if frame is None:
+            self._slots.release()
+            return False
+        deadline = time.perf_counter() + self.config.max_wait
+        self._batch = _Batch(frame, deadline, self.position)
+        return True
+
+    def _read(
+        self, seq: int, roi, key: Optional[int] = None, track: Optional[Track] = None
+    ) -> bool:
+        """
+        只把识别区域(或物品框)裁剪缩放到模型输入尺寸后写入批缓冲
+        """
+        batch = self._batch
+        out = batch.frame.array[len(batch)]
+        ret = self.capture.ring.read(
+            seq, out, self.config.order, self.config.input_size, roi
+        )
+        if ret is None:
+            return False
+        batch.seqs.append(seq)
+        batch.timestamps.append(ret[1])
+        batch.keys.append(key)
+        batch.tracks.append(track)
+        return True
+
+    def _submit(self) -> None:
+        """
+        按推理耗时中位数估计完成时间, 丢弃来不及在max_age内出结果的帧
+        """
+        batch, self._batch = self._batch, None
+        expected = self.inference_stats.percentile(50) / 1000
+        cutoff = time.perf_counter() + expected - self.config.max_age
+        self._drop(batch.drop_before(cutoff))
+        if len(batch) == 0:
+            batch.frame.release()
+            self._slots.release()
+            return
+        # 子进程开始推理时最新一帧也已过期则跳过
+        deadline = batch.timestamps[-1] + self.config.max_age - expected
+        self._pool.apply_async(
+            _classify,
+            (batch.images, deadline),
+            callback=lambda r, b=batch: self._on_done(b, r),
+            error_callback=lambda e, b=batch: self._on_error(b, e),
+        )
+
+    @property
+    def mean_batch(self) -> float:
+        return self.images / self.batches if self.batches else 0.0
+
+    @property
+    def cpu_time_saved(self) -> float:
+        """
+        门限拦截的帧节省的推理时间(s), 已扣除门限自身耗时
+        """
+        skipped = self.gate.frames_checked - self.gate.frames_passed
+        per_image = self.inference_stats.mean * self.batches / max(self.images, 1)
+        saved = skipped * per_image
+        cost = self.gate.frames_checked * self.gate.gate_stats.mean
+        return (saved - cost) / 1000
+
+    def _drop(self, tracks) -> None:
+        self.frames_stale += len(tracks)
+        for track in tracks:
+            if track is not None:
+                track.pending = False
+
+    def _on_done(self, batch: _Batch, result) -> None:
+        batch.frame.release()
+        self._slots.release()
+        if result is None or batch.position != self.position or self._paused:
+            self._drop(batch.tracks)
+            return
+        scores, latency = result
+        self.inference_stats.add(latency)
+        self.batches += 1
+        self.images += len(batch)
+        for key, s in zip(batch.keys, scores):
+            if key is not None:
+                self.cache.put(key, s)
+        if self.config.mode == "detect":
+            for seq, timestamp, s, track in zip(
+                batch.seqs, batch.timestamps, scores, batch.tracks
+            ):
+                self._emit(seq, timestamp, s, latency, track)
+            return
+        with self._lock:
+            if batch.seqs[-1] <= self._last_seq:  # 多进程完成顺序不定, 丢弃过期结果
+                self.frames_stale += len(batch)
+                return
+            self._last_seq = batch.seqs[-1]
+        for seq, timestamp, s in zip(batch.seqs, batch.timestamps, scores):
+            self._emit(seq, timestamp, s, latency)
+
+    def _emit(
+        self,
+        seq: int,
+        timestamp: float,
+        scores: np.ndarray,
+        latency,
+        track: Optional[Track] = None,
+    ) -> None:
+        """
+        单帧结果(推理或缓存命中)送入投票, 提交时回调on_result
+        检测模式下按轨迹投票, 轨迹提交后固定类别, 之后到达的结果忽略
+        """
+        if self._paused or timestamp < self._resumed_at:  # 转动中采集的帧
+            self._drop([track])
+            return
+        age = time.perf_counter() - timestamp
+        self.latency_stats.add(age)
+        self.staleness.add(age)
+        self.stats.tick()
+        index = int(np.argmax(scores))
+        self.last_result = Recognition(
+            seq,
+            timestamp,
+            index,
+            self.config.labels[index],
+            float(scores[index]),
+            latency,
+        )
+        with self._lock:
+            if track is None:
+                vote = self.voter.add(scores)
+            else:
+                track.pending = False
+                if track.classified:
+                    return
+                vote = track.voter.add(scores)
+                if vote is not None:
+                    track.label = vote[0]
+        if vote is None:
+            return
+        index, confidence = vote
+        recognition = Recognition(
+            seq,
+            timestamp,
+            index,
+            self.config.labels[index],
+            confidence,
+            latency,
+            track_id=None if track is None else track.id,
+            box=None if track is None else track.box,
+        )
+        if self.on_result is not None:
+            self.on_result(recognition)
+
+    def _on_ready(self, warmup_time: float) -> None:
+        self.warmup_time = warmup_time
+        self.ready.set()
+        if self.config.samples:
+            self._pool.apply_async(
+                _evaluate,
+                (self.config.samples,),
+                callback=self._on_report,
+                error_callback=self._on_init_error,
+            )
+
+    def _on_report(self, report: dict) -> None:
+        self.report = report
+        if self.on_report is not None:
+            self.on_report(report)
+
+    def _on_init_error(self, error) -> None:
+        self.errors += 1
+        self.last_error = error
+        self.ready.set()  # 不阻塞等待模型的一方, 错误由last_error报告
+
+    def _on_error(self, batch: _Batch, error) -> None:
+        batch.frame.release()
+        self._slots.release()
+        for track in batch.tracks:
+            if track is not None:
+                track.pending = False
+        self.errors += 1
+        self.last_error = error
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self.is_alive():
+            self.join(1)
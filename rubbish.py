@@ -60,19 +60,51 @@ from PySide6.QtWidgets import (
 pyside imports
 """
 
+import logging
 import os
 import random
 import shutil
 import sys
+import threading
 import time
 import warnings
+from concurrent.futures import Future
 
 import cv2
 import numpy as np
 import qdarktheme
 import skvideo.io
 
-from H750_STEP.python_sdk.FlightController import FC_Controller, logger
+from cache import RecognitionCache
+from camera import CameraConfig
+from capture import (
+    CaptureThread,
+    FrameMailbox,
+    FramePool,
+    PooledFrame,
+    converted_shape,
+    fit_size,
+)
+from detection import BlobDetector, IoUTracker
+from frame_source import create_source
+from gate import ChangeGate
+from gui import PyVideoView
+from gui.core.json_settings import Settings
+from labels import category, emoji, item_list
+from motion import CarouselPlanner, Motion
+from recognition import Recognition, RecognitionConfig, RecognitionEngine
+from mission import SortCycle
+from stats import PipelineStats
+from voting import ResultVoter
+from fc_sim import SimulatedController
+
+try:
+    from H750_STEP.python_sdk.FlightController import FC_Controller, logger
+except ImportError:  # 未拉取控制器子模块时只能使用模拟控制器
+    from fc_sim import logger
+
+    FC_Controller = None
+    logging.basicConfig(level=logging.INFO)
 from rubbish_gui import Ui_MainWindow
 
 colors = {
@@ -84,44 +116,80 @@ colors = {
 text_color = "#FCFCFC"
 warning_color = "#EB1900"
 warning_percent = 90
+overlay_color = "#FFFF00"
 font = "更纱黑体 UI SC"
-emoji = {
-    "1号电池": "🔋",
-    "2号电池": "🔋",
-    "5号电池": "🔋",
-    "过期药物": "💊",
-    "易拉罐": "🥤",
-    "矿泉水瓶": "🥤",
-    "小土豆": "🥔",
-    "白萝卜": "🥕",
-    "胡萝卜": "🥕",
-    "瓷片": "🍽️",
-    "鹅卵石": "🗿",
-}
-category = {
-    "1号电池": "有害垃圾",
-    "2号电池": "有害垃圾",
-    "5号电池": "有害垃圾",
-    "过期药物": "有害垃圾",
-    "易拉罐": "可回收垃圾",
-    "矿泉水瓶": "可回收垃圾",
-    "小土豆": "厨余垃圾",
-    "白萝卜": "厨余垃圾",
-    "胡萝卜": "厨余垃圾",
-    "瓷片": "其他垃圾",
-    "鹅卵石": "其他垃圾",
+image_formats = {
+    "RGB": QImage.Format.Format_RGB888,
+    "BGR": QImage.Format.Format_BGR888,
 }
-item_list = list(category.keys())
 video_file = r"test_h264.mp4"
-videoCapture = cv2.VideoCapture(video_file)
-video_fps = videoCapture.get(cv2.CAP_PROP_FPS)
-video_frame_num = int(videoCapture.get(cv2.CAP_PROP_FRAME_COUNT))
-video_width = int(videoCapture.get(cv2.CAP_PROP_FRAME_WIDTH))
-video_height = int(videoCapture.get(cv2.CAP_PROP_FRAME_HEIGHT))
-videoCapture.release()
-cam = cv2.VideoCapture()
-api = FC_Controller()
-# api.start_listen_serial("COM11", 115200)
+
+
+def init():
+    """
+    构建采集/识别/控制器等全局对象, 只在主进程调用
+    识别进程池以spawn方式启动时子进程会导入本模块, 模块级代码不能打开摄像头或控制器
+    """
+    global video_fps, video_frame_num, video_width, video_height, settings
+    global stats_window, capture, convert_stats, display_stats, recognizer
+    global stage_stats, frame_pool, frame_mailbox, api, motion
+    videoCapture = cv2.VideoCapture(video_file)
+    video_fps = videoCapture.get(cv2.CAP_PROP_FPS)
+    video_frame_num = int(videoCapture.get(cv2.CAP_PROP_FRAME_COUNT))
+    video_width = int(videoCapture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    video_height = int(videoCapture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    videoCapture.release()
+    settings = Settings().items
+    stats_window = settings.get("stats", {}).get("window", 120)
+    capture = CaptureThread(
+        source=create_source(
+            settings.get("source", {}),
+            CameraConfig.from_dict(settings.get("camera", {})),
+        ),
+        stats_window=stats_window,
+    )
+    convert_stats = PipelineStats("convert", stats_window)
+    display_stats = PipelineStats("display", stats_window)
+    config = RecognitionConfig.from_dict(settings.get("recognition", {}))
+    recognizer = RecognitionEngine(
+        capture,
+        config,
+        stats_window,
+        ChangeGate.from_dict(settings.get("gate", {}), stats_window),
+        ResultVoter.from_dict(settings.get("voting", {}), config.threshold),
+        RecognitionCache.from_dict(settings.get("cache", {})),
+        BlobDetector.from_dict(settings.get("detection", {})),
+        IoUTracker.from_dict(settings.get("tracker", {})),
+    )
+    stage_stats = [capture.stats, convert_stats, display_stats, recognizer.stats]
+    frame_pool = FramePool()
+    frame_mailbox = FrameMailbox()
+    controller_settings = settings.get("controller", {})
+    if controller_settings.get("type", "serial") == "sim":
+        api = SimulatedController.from_dict(controller_settings.get("sim", {}))
+    elif FC_Controller is None:
+        raise RuntimeError(
+            'H750_STEP submodule missing, set controller.type to "sim"'
+        )
+    else:
+        api = FC_Controller()
+        # api.start_listen_serial("COM11", 115200)
+    motion_settings = settings.get("motion", {})
+    motion = Motion(
+        api,
+        CarouselPlanner(
+            speed=motion_settings.get("speed", 45),
+            settle=motion_settings.get("settle", 0.1),
+            directions={
+                getattr(api, motor): direction
+                for motor, direction in motion_settings.get(
+                    "directions", {}
+                ).items()
+            },
+        ),
+        on_start=sig.start_processbar_signal.emit,
+        live_progress=motion_settings.get("live_progress", True),
+    )
 
 
 def set_color(widget, rgb):
@@ -129,35 +197,9 @@ def set_color(widget, rgb):
     widget.setStyleSheet(f"color: {color}")
 
 
-class fps_counter:
-    def __init__(self, max_sample=40) -> None:
-        self.t = time.perf_counter()
-        self.max_sample = max_sample
-        self.t_list = []
-
-    def tick(self) -> None:
-        now = time.perf_counter()
-        self.t_list.append(now - self.t)
-        self.t = now
-        if len(self.t_list) > self.max_sample:
-            self.t_list.pop(0)
-
-    @property
-    def fps(self) -> float:
-        length = len(self.t_list)
-        sum_t = sum(self.t_list)
-        if length == 0:
-            return 0.0
-        else:
-            return length / sum_t
-
-
-fpsc = fps_counter()
-
-
 class MySignal(QObject):
-    image_signal = Signal(np.ndarray)
-    start_processbar_signal = Signal(int)
+    image_signal = Signal()
+    start_processbar_signal = Signal(float)
     finish_processbar_signal = Signal()
     update_bin_progress_signal = Signal(int, int, int, int)
     set_system_status_signal = Signal(str)
@@ -179,15 +221,31 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.init_threads()
         self.init_signals()
         self.setGeometry(0, 0, 1024, 700)
-        self.misThread.start()
         self.image_temp = None
+        self.bytes_per_frame = 0
+        self.frames_displayed = 0
+        self.display_latency = 0.0
+        self.paint_time = 0.0
+        self.overlay = []
+        self.misThread.start()
 
     def init_timers(self):
+        # 低频轮询运动进度, 数值变化时才重绘
         self.processbar_timer = QTimer()
+        self.processbar_timer.setInterval(
+            settings.get("display", {}).get("progress_interval", 100)
+        )
         self.processbar_timer.timeout.connect(self.update_processbar)
         self.video_timer = QTimer()
         self.video_timer.setTimerType(Qt.PreciseTimer)
         self.video_timer.timeout.connect(self.read_video)
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.log_display_stats)
+        self.stats_timer.start(5000)
+        # 叠加文字每秒刷新一次, 不在每帧计算分位数
+        self.overlay_timer = QTimer()
+        self.overlay_timer.timeout.connect(self.update_overlay)
+        self.overlay_timer.start(1000)
 
     def init_threads(self):
         self.misThread = QThread()
@@ -218,17 +276,27 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.labelSystem.setText("正在初始化...")
         self.labelResult.setText("等待识别")
         self.progressProcess.setMaximum(100)
+        if settings.get("display", {}).get("backend", "label") == "opengl":
+            view = PyVideoView(self.frameVideo)
+            view.setObjectName("labelVideo")
+            self.verticalLayout_5.replaceWidget(self.labelVideo, view)
+            self.labelVideo.deleteLater()
+            self.labelVideo = view
+        self.use_gl_view = isinstance(self.labelVideo, PyVideoView)
 
     def update_processbar(self):
-        current = self.progressProcess.value()
-        if current == 100:
-            self.processbar_timer.stop()
+        if not motion.moving:
+            self.finish_processbar()
             return
-        self.progressProcess.setValue(current + 1)
+        value = int(motion.progress() * 100)
+        if value != self.progressProcess.value():
+            self.progressProcess.setValue(value)
 
-    def start_processbar(self, estimate_time):
+    def start_processbar(self, estimate_time: float):
         self.progressProcess.setValue(0)
-        self.processbar_timer.start(estimate_time * 1000 / 100)
+        self.progressProcess.setToolTip(f"预计 {estimate_time:.1f}s")
+        if not self.processbar_timer.isActive():
+            self.processbar_timer.start()
 
     def finish_processbar(self):
         self.progressProcess.setValue(100)
@@ -284,42 +352,134 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         except StopIteration:
             self.stop_video()
 
-    def show_image(self, image: np.ndarray):
-        fpsc.tick()
-        self._image = image.copy()
-        cv2.putText(
-            self._image,
-            f"{fpsc.fps:.2f}FPS",
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (255, 255, 0),
-            2,
+    @property
+    def frames_dropped(self) -> int:
+        return self.worker.frames_skipped + frame_mailbox.frames_dropped
+
+    def log_display_stats(self):
+        logger.info(
+            f"Display stats: captured {capture.frames_captured}, "
+            f"displayed {self.frames_displayed}, dropped {self.frames_dropped}, "
+            f"latency {self.display_latency:.1f}ms, "
+            f"paint {self.paint_time:.2f}ms "
+            f"({'opengl' if self.use_gl_view else 'label'})"
         )
+        for stats in stage_stats:
+            logger.info(f"Stage stats: {stats.summary()}")
+        if recognizer.config.enabled:
+            logger.info(
+                f"Recognition stats: {recognizer.inference_stats.summary()}, "
+                f"{recognizer.latency_stats.summary()}, "
+                f"batch {recognizer.mean_batch:.1f}, errors {recognizer.errors}"
+            )
+            logger.info(
+                f"Staleness: dropped {recognizer.frames_stale}, "
+                f"{recognizer.staleness.summary()}"
+            )
+            logger.info(
+                f"Gate stats: pass rate {recognizer.gate.pass_rate * 100:.1f}%, "
+                f"score {recognizer.gate.score:.1f}, "
+                f"{recognizer.gate.gate_stats.summary()}, "
+                f"cpu saved {recognizer.cpu_time_saved:.1f}s"
+            )
+            logger.info(
+                f"Voting stats: frames {recognizer.voter.frames_voted}, "
+                f"commits {recognizer.voter.commits}, "
+                f"suppressed {recognizer.frames_suppressed}"
+            )
+            if recognizer.config.mode == "detect":
+                logger.info(
+                    f"Tracker stats: tracks {recognizer.tracker.tracks_created}, "
+                    f"active {len(recognizer.tracker.tracks)}"
+                )
+            cache = recognizer.cache
+            if cache.enabled:
+                logger.info(
+                    f"Cache stats: hit rate {cache.hit_rate * 100:.1f}% "
+                    f"({cache.hits}/{cache.hits + cache.misses}), "
+                    f"entries {len(cache)}, evictions {cache.evictions}, "
+                    f"expired {cache.expired}"
+                )
+            if recognizer.last_error is not None:
+                logger.error(f"Recognition error: {recognizer.last_error!r}")
+        if self.worker.sorter.items_sorted:
+            logger.info(
+                f"Sort stats: {self.worker.sorter.summary()}, "
+                f"moves {motion.moves} coalesced {motion.coalesced}, "
+                f"time ratio {motion.time_ratio:.2f}"
+            )
+
+    def update_overlay(self):
+        self.overlay = [stats.summary() for stats in stage_stats] + [
+            f"cap {capture.frames_captured} disp {self.frames_displayed} "
+            f"drop {self.frames_dropped} "
+            f"latency {self.display_latency:.0f}ms {self.bytes_per_frame / 1e6:.2f}MB"
+        ]
+        if self.use_gl_view:
+            self.labelVideo.set_overlay(self.overlay)
+
+    def show_image(self, frame: PooledFrame = None):
+        if frame is None:
+            frame = frame_mailbox.take()
+            if frame is None:  # 该帧已被更新的帧合并
+                return
+        elif isinstance(frame, np.ndarray):  # skvideo回放帧为RGB
+            frame = PooledFrame(frame, order="RGB")
+        display_stats.tick()
+        image = frame.array  # 缓冲所有权已交给界面线程, 显示完毕后归还
+        if self.use_gl_view:  # 纹理上传与缩放由GPU完成
+            self.labelVideo.set_image(image, image_formats[frame.order])
+            self.paint_time = self.labelVideo.paint_time
+        else:
+            t0 = time.perf_counter()
+            self.set_video_pixmap(image, frame.order)
+            self.paint_time = (time.perf_counter() - t0) * 1000
+        self.publish_display_size()
+        frame.bytes_copied += image.nbytes  # QPixmap.fromImage / 纹理上传
+        self.bytes_per_frame = frame.bytes_copied
+        self.frames_displayed += 1
+        if frame.timestamp:
+            self.display_latency = (time.perf_counter() - frame.timestamp) * 1000
+        if self.image_temp is not None:
+            self.image_temp.release()
+        self.image_temp = frame
+
+    def publish_display_size(self):
+        # 任务线程按该尺寸缩放, 界面线程只需贴图; OpenGL视图由GPU缩放
+        if self.use_gl_view:
+            return
+        self.worker.display_size = (self.labelVideo.width(), self.labelVideo.height())
+
+    def set_video_pixmap(self, image: np.ndarray, order: str = "BGR"):
+        width, height = self.labelVideo.width(), self.labelVideo.height()
         self.pixmap = QPixmap.fromImage(
             QImage(
-                self._image,
-                self._image.shape[1],
-                self._image.shape[0],
-                QImage.Format.Format_RGB888,
+                image,
+                image.shape[1],
+                image.shape[0],
+                image.strides[0],
+                image_formats[order],
             )
-        ).scaled(self.labelVideo.width(), self.labelVideo.height(), Qt.KeepAspectRatio)
+        )
+        if (image.shape[1], image.shape[0]) != fit_size(image.shape, (width, height)):
+            self.pixmap = self.pixmap.scaled(width, height, Qt.KeepAspectRatio)
+        self.draw_overlay(self.pixmap)
         self.labelVideo.setPixmap(self.pixmap)
-        self.image_temp = self._image
+
+    def draw_overlay(self, pixmap: QPixmap):
+        # 统计信息以矢量文字画在显示用的pixmap上, 不修改帧缓冲
+        painter = QPainter(pixmap)
+        painter.setFont(QFont(font, 10))
+        painter.setPen(QColor(overlay_color))
+        line_height = painter.fontMetrics().height()
+        for i, line in enumerate(self.overlay):
+            painter.drawText(10, line_height * (i + 1), line)
+        painter.end()
 
     def resizeEvent(self, event) -> None:
-        if self.image_temp is not None:
-            self.pixmap = QPixmap.fromImage(
-                QImage(
-                    self.image_temp,
-                    self.image_temp.shape[1],
-                    self.image_temp.shape[0],
-                    QImage.Format.Format_RGB888,
-                )
-            ).scaled(
-                self.labelVideo.width(), self.labelVideo.height(), Qt.KeepAspectRatio
-            )
-            self.labelVideo.setPixmap(self.pixmap)
+        self.publish_display_size()
+        if self.image_temp is not None and not self.use_gl_view:
+            self.set_video_pixmap(self.image_temp.array, self.image_temp.order)
         return super().resizeEvent(event)
 
     # F11 全屏
@@ -332,38 +492,104 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         return super().keyPressEvent(event)
 
     def closeEvent(self, event) -> None:
+        motion.shutdown()
+        recognizer.stop()
+        capture.stop()
         self.misThread.quit()
         return super().closeEvent(event)
 
 
 class MissionThread(QObject):
-    ### 设置
-    rotation_speed = 45
-
     ### 变量
     sight_pos = 1  # 当前视角位置 一共六格
     down_pos = 0  # 下盘位置 一共六格
+    tray_move = None  # 最近一次转盘运动的Future
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.frames_converted = 0  # 送往界面的帧数
+        self.display_size = None  # 界面视频区域尺寸(w, h), 由界面线程更新
+        # 分拣流程: 物品N的转动/投放与物品N+1的识别重叠
+        self.sorter = SortCycle(
+            self.left,
+            self.release_next,
+            recognizer.reset,
+            settings.get("mission", {}).get("pipelined", True),
+            stats_window,
+            sig.set_system_status_signal.emit,
+        )
 
-    def show_image(self, image: np.ndarray):
-        self._image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        sig.image_signal.emit(self._image)
+    @property
+    def frames_skipped(self) -> int:
+        """
+        未送往界面的帧数, 帧序号不连续, 按发布帧数统计
+        """
+        return max(capture.ring.frames_published - self.frames_converted, 0)
+
+    def show_image(self, seq: int) -> int:
+        shape = capture.ring.shape
+        size = None if self.display_size is None else fit_size(shape, self.display_size)
+        frame = frame_pool.acquire(converted_shape(shape, None, size))
+        if frame is None:  # 界面仍占用全部缓冲, 丢弃该帧
+            return capture.ring.seq
+        # 界面直接显示BGR不做转换, 在本线程缩放到显示尺寸
+        ret = capture.next_after(seq, 0, out=frame.array, size=size)
+        if ret is None:
+            frame.release()
+            return seq
+        frame.seq, frame.timestamp, frame.array = ret
+        frame.order = capture.ring.order
+        frame.bytes_copied = frame.array.nbytes
+        self.frames_converted += 1
+        convert_stats.tick()
+        if frame_mailbox.post(frame):  # 信箱中已有帧时界面必然会被通知, 不再重复发送
+            sig.image_signal.emit()
+        return frame.seq
+
+    def on_camera_state(self, state: str):
+        if state == "connected":
+            logger.info(f"Opened {capture.source.describe()}")
+            recognizer.reset_background()
+            sig.set_system_status_signal.emit(f"摄像头已连接")
+        elif state == "not_found":
+            logger.warn("No camera found")
+            sig.set_system_status_signal.emit(f"错误: 未找到摄像头")
+        elif state == "lost":
+            logger.warn("Camera lost, reconnecting")
+            sig.set_system_status_signal.emit(f"摄像头断开, 正在重连...")
+        elif state == "finished":
+            logger.info("Replay finished")
+            sig.set_system_status_signal.emit(f"回放结束")
+        elif state == "first_frame":
+            logger.info(
+                f"Time to first frame: {capture.time_to_first_frame * 1000:.0f}ms"
+            )
+
+    def on_recognition(self, result: Recognition):
+        # 在识别引擎的回调线程中执行, 每个物品只回调一次, 通过信号更新界面
+        track = "" if result.track_id is None else f" track {result.track_id}"
+        logger.info(f"Recognized {result.name} ({result.confidence:.2f}){track}")
+        sig.set_recognize_result_signal.emit(result.category, result.name)
+        sig.add_recognized_item_signal.emit(result.category, result.name)
+        self.sorter.put(result)
+
+    def on_model_report(self, report: dict):
+        logger.info(
+            f"Model report: {report['model']} ({report['input_dtype']}), "
+            f"accuracy {report['accuracy'] * 100:.1f}% on {report['images']} images, "
+            f"latency {report['latency_mean_ms']:.1f}ms "
+            f"p95 {report['latency_p95_ms']:.1f}ms"
+        )
 
     def run(self):
-        while True:
-            for i in range(0,10):
-                cam.open(i)
-                if cam.isOpened():
-                    logger.info(f"Opened camera {i}")
-                    break
-            if not cam.isOpened():
-                logger.warn("No camera found")
-                sig.set_system_status_signal.emit(f"错误: 未找到摄像头")
-            else:
-                sig.set_system_status_signal.emit(f"摄像头已连接")
-                break
+        capture.on_state = self.on_camera_state
+        capture.start()
+        if recognizer.config.enabled:  # 模型在校准和连接控制器期间后台加载预热
+            recognizer.position = self.sight_pos
+            recognizer.on_result = self.on_recognition
+            recognizer.on_report = self.on_model_report
+            recognizer.start()
+        threading.Thread(target=self.mission, name="Mission", daemon=True).start()
         while True:
             try:
                 self.work()
@@ -375,52 +601,78 @@ class MissionThread(QObject):
                 sig.set_system_status_signal.emit("任务线程正常退出")
                 break
 
+    def mission(self):
+        # 在单独线程中连接控制器并分拣, 任务线程继续刷新画面
+        time.sleep(1)
+        sig.set_system_status_signal.emit("等待控制器连接中...")
+        api.wait_for_connection(-1)
+        sig.set_system_status_signal.emit("控制器连接成功")
+        self.calibration()
+        if not recognizer.config.enabled:
+            sig.set_system_status_signal.emit("识别未启用")
+            return
+        while True:
+            try:
+                self.sorter.run()
+            except Exception as e:
+                sig.set_system_status_signal.emit(f"分拣异常, 正在重启...")
+                logger.exception(e)
+                time.sleep(1)
+
     def calibration(self):
         sig.set_system_status_signal.emit("正在校准储物盘")
         time.sleep(1)
+        if recognizer.config.enabled:
+            if not recognizer.ready.is_set():
+                sig.set_system_status_signal.emit("正在加载识别模型")
+                recognizer.ready.wait()
+            if recognizer.last_error is not None:
+                logger.error(f"Recognition model failed: {recognizer.last_error!r}")
+            else:
+                logger.info(f"Model ready, warmup {recognizer.warmup_time:.2f}s")
         sig.set_system_status_signal.emit("校准完成")
         time.sleep(1)
 
-    def left(self):
-        self.sight_pos = (self.sight_pos + 1) % 6
-        api.step_rotate_abs(api.STEP1, self.sight_pos * 60)
-        api.step_rotate_abs(api.STEP2, (self.sight_pos - self.down_pos) * 60)
-        api.wait_for_step_idle(api.STEP1 | api.STEP2)
+    # 运动指令立即返回Future, 只在后续步骤依赖运动完成时调用result()等待
+    def left(self) -> Future:
+        return self.goto((self.sight_pos + 1) % 6)
 
-    def right(self):
-        self.sight_pos = (self.sight_pos - 1) % 6
-        api.step_rotate_abs(api.STEP1, self.sight_pos * 60)
-        api.step_rotate_abs(api.STEP2, (self.sight_pos - self.down_pos) * 60)
-        api.wait_for_step_idle(api.STEP1 | api.STEP2)
+    def right(self) -> Future:
+        return self.goto((self.sight_pos - 1) % 6)
 
-    def goto(self, pos):
+    def goto(self, pos) -> Future:
         self.sight_pos = pos
-        api.step_rotate_abs(api.STEP1, self.sight_pos * 60)
-        api.step_rotate_abs(api.STEP2, (self.sight_pos - self.down_pos) * 60)
-        api.wait_for_step_idle(api.STEP1 | api.STEP2)
+        # 转动过程中暂停识别, 转动中采集的帧不参与投票
+        recognizer.pause()
+        recognizer.position = self.sight_pos
+        # 连续的转盘运动会合并, 只走最终位置的最短路径
+        future = motion.rotate(
+            {api.STEP1: self.sight_pos, api.STEP2: self.sight_pos - self.down_pos}
+        )
+        self.tray_move = future
+        future.add_done_callback(self.on_tray_moved)
+        return future
+
+    def on_tray_moved(self, future: Future):
+        if future is self.tray_move:  # 之后又提交了转动时保持暂停
+            recognizer.resume()
 
-    def release_next(self):
+    def release_next(self) -> Future:
         self.down_pos = self.down_pos + 1
-        api.step_rotate_abs(api.STEP2, (self.sight_pos - self.down_pos) * 60)
-        api.wait_for_step_idle(api.STEP2)
+        return motion.rotate(
+            {api.STEP2: self.sight_pos - self.down_pos}, coalesce=False
+        )
 
     def work(self):
+        seq = -1
         while True:
-            ret, frame = cam.read()
-            if not ret:
+            if not capture.ring.wait(seq, timeout=1):
                 continue
-            self.show_image(frame)
-        
-        time.sleep(1)
-        sig.set_system_status_signal.emit("等待控制器连接中...")
-        api.wait_for_connection(-1)
-        sig.set_system_status_signal.emit("控制器连接成功")
-        api.step_set_speed(api.STEP1 | api.STEP2, self.rotation_speed)
-        time.sleep(1)
-        self.calibration()
+            seq = self.show_image(seq)
 
 
 if __name__ == "__main__":
+    init()
     app = QApplication([])
     app.setStyleSheet(qdarktheme.load_stylesheet(theme="dark"))
     window = MainWindow()
@@ -0,0 +1,182 @@
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class PipelineStats:
+    """
+    流水线单个环节的滚动统计, 帧间隔存放在固定大小的环形数组中
+    tick为O(1), 统计量在读取时按窗口计算
+    """
+
+    def __init__(self, name: str, window: int = 120) -> None:
+        self.name = name
+        self.window = window
+        self.intervals = np.zeros(window, dtype=np.float64)
+        self.count = 0  # 窗口内有效样本数
+        self.total = 0  # 累计tick次数
+        self._index = 0
+        self._last: Optional[float] = None
+
+    def tick(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.perf_counter()
+        if self._last is not None:
+            self.intervals[self._index] = now - self._last
+            self._index = (self._index + 1) % self.window
+            if self.count < self.window:
+                self.count += 1
+        self._last = now
+        self.total += 1
+
+    def reset(self) -> None:
+        self.count = 0
+        self._index = 0
+        self._last = None
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self.intervals[: self.count]
+
+    @property
+    def fps(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return self.count / float(self.samples.sum())
+
+    def percentile(self, q) -> float:
+        """
+        帧间隔百分位数(ms)
+        """
+        if self.count == 0:
+            return 0.0
+        return float(np.percentile(self.samples, q)) * 1000
+
+    @property
+    def jitter(self) -> float:
+        """
+        帧间隔标准差(ms)
+        """
+        if self.count == 0:
+            return 0.0
+        return float(self.samples.std()) * 1000
+
+    @property
+    def max_stall(self) -> float:
+        """
+        窗口内最长帧间隔(ms), 包含距上次tick至今的停顿
+        """
+        stall = float(self.samples.max()) if self.count else 0.0
+        if self._last is not None:
+            stall = max(stall, time.perf_counter() - self._last)
+        return stall * 1000
+
+    def snapshot(self) -> dict:
+        p50, p95, p99 = (
+            np.percentile(self.samples, (50, 95, 99)) * 1000
+            if self.count
+            else (0.0, 0.0, 0.0)
+        )
+        return {
+            "name": self.name,
+            "frames": self.total,
+            "fps": self.fps,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "jitter": self.jitter,
+            "max_stall": self.max_stall,
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"{s['name']} {s['fps']:.1f}fps p50/95/99 "
+            f"{s['p50']:.0f}/{s['p95']:.0f}/{s['p99']:.0f}ms "
+            f"jitter {s['jitter']:.1f}ms stall {s['max_stall']:.0f}ms"
+        )
+
+
+class LatencyStats:
+    """
+    耗时滚动统计(ms), 与PipelineStats相同的环形数组, add为O(1)
+    """
+
+    def __init__(self, name: str, window: int = 120) -> None:
+        self.name = name
+        self.window = window
+        self.values = np.zeros(window, dtype=np.float64)
+        self.count = 0
+        self.total = 0
+        self._index = 0
+
+    def add(self, seconds: float) -> None:
+        self.values[self._index] = seconds * 1000
+        self._index = (self._index + 1) % self.window
+        if self.count < self.window:
+            self.count += 1
+        self.total += 1
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self.values[: self.count]
+
+    @property
+    def mean(self) -> float:
+        return float(self.samples.mean()) if self.count else 0.0
+
+    def percentile(self, q) -> float:
+        return float(np.percentile(self.samples, q)) if self.count else 0.0
+
+    def snapshot(self) -> dict:
+        p50, p95, p99 = (
+            np.percentile(self.samples, (50, 95, 99)) if self.count else (0.0, 0.0, 0.0)
+        )
+        return {
+            "name": self.name,
+            "count": self.total,
+            "mean": self.mean,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(self.samples.max()) if self.count else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"{s['name']} {s['mean']:.1f}ms p50/95/99 "
+            f"{s['p50']:.0f}/{s['p95']:.0f}/{s['p99']:.0f}ms max {s['max']:.0f}ms"
+        )
+
+
+class Histogram:
+    """
+    耗时分布直方图(ms), edges为各桶上界, 最后一桶为超过最大上界的样本, 累计全部样本
+    """
+
+    def __init__(self, name: str, edges=(50, 100, 200, 500, 1000, 2000)) -> None:
+        self.name = name
+        self.edges = np.array(edges, dtype=np.float64)
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+
+    def add(self, seconds: float) -> None:
+        self.counts[np.searchsorted(self.edges, seconds * 1000, side="right")] += 1
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def snapshot(self) -> dict:
+        labels = [f"<{e:g}" for e in self.edges] + [f">={self.edges[-1]:g}"]
+        return {
+            "name": self.name,
+            "count": self.total,
+            "buckets": dict(zip(labels, self.counts.tolist())),
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        buckets = " ".join(f"{k}:{v}" for k, v in s["buckets"].items())
+        return f"{s['name']} ms {buckets}"
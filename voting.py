@@ -0,0 +1,92 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class ResultVoter:
+    """
+    识别结果时间投票, 在滑动窗口内累加各类别概率
+    窗口平均概率稳定超过阈值后对该物品提交一次结果, 之后不再重复提交, 直到reset(场景变化)
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        window=8,
+        min_frames=3,
+        threshold=0.6,
+        margin=0.2,
+    ) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.min_frames = min_frames
+        self.threshold = threshold
+        self.margin = margin  # 第一名与第二名平均概率的最小差距
+        self.committed: Optional[int] = None  # 已提交的类别
+        self.commits = 0
+        self.frames_voted = 0
+        self._scores: Optional[np.ndarray] = None
+        self._sum: Optional[np.ndarray] = None
+        self._index = 0
+        self._count = 0
+
+    @classmethod
+    def from_dict(cls, items: dict, threshold: float = 0.6) -> "ResultVoter":
+        items = dict(items)
+        items.setdefault("threshold", threshold)
+        return cls(**items)
+
+    def clone(self) -> "ResultVoter":
+        """
+        相同参数的新投票器
+        """
+        return ResultVoter(
+            self.enabled, self.window, self.min_frames, self.threshold, self.margin
+        )
+
+    def reset(self) -> None:
+        self.committed = None
+        self._index = 0
+        self._count = 0
+        if self._sum is not None:
+            self._scores.fill(0)
+            self._sum.fill(0)
+
+    @property
+    def mean(self) -> Optional[np.ndarray]:
+        if self._count == 0:
+            return None
+        return self._sum / self._count
+
+    def add(self, scores: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        加入一帧的类别概率, 需要提交时返回(类别, 平均概率)
+        """
+        if not self.enabled:
+            index = int(np.argmax(scores))
+            if scores[index] < self.threshold:
+                return None
+            return index, float(scores[index])
+        if self._scores is None or self._scores.shape[1] != len(scores):
+            self._scores = np.zeros((self.window, len(scores)), dtype=np.float64)
+            self._sum = np.zeros(len(scores), dtype=np.float64)
+            self._index = self._count = 0
+        # 环形窗口, 总和增量更新
+        self._sum -= self._scores[self._index]
+        self._scores[self._index] = scores
+        self._sum += scores
+        self._index = (self._index + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        self.frames_voted += 1
+        if self._count < self.min_frames:
+            return None
+        mean = self._sum / self._count
+        top2 = np.argpartition(mean, -2)[-2:]
+        first, second = (top2[1], top2[0]) if mean[top2[1]] >= mean[top2[0]] else top2
+        if mean[first] < self.threshold or mean[first] - mean[second] < self.margin:
+            return None
+        if first == self.committed:
+            return None
+        self.committed = int(first)
+        self.commits += 1
+        return self.committed, float(mean[first])